@@ -0,0 +1,142 @@
+################################################################################
+###################################요청 수 제한##################################
+################################################################################
+# 요청 종류별로 동시 처리 수와 대기열 길이를 제한한다.
+#   read      : 게시판/소개/피드/검색 조회 (GET, HEAD)
+#   write     : 관리자 수정/삭제, 댓글 작성 등 (POST, PUT, DELETE)
+#   upload    : 파일이 포함된 multipart 요청
+#   download  : /files, /images 첨부 파일 전송
+#   thumbnail : 백그라운드 작업의 원격 이미지 썸네일 생성
+# 종류마다 따로 제한하므로 업로드가 몰려도 조회 요청은 자기 몫의 슬롯을 쓴다.
+# 대기열이 가득 차거나 대기 시간이 지나면 바로 503과 Retry-After로 응답한다.
+
+from contextlib import asynccontextmanager
+from typing import Dict
+import asyncio
+import json
+import os
+
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))  # 대기열에서 기다리는 최대 시간(초)
+RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")  # 거절 응답의 Retry-After(초)
+
+# 종류: (동시 처리 수, 대기열 길이)
+DEFAULT_LIMITS = {
+    "read": (32, 256),
+    "write": (8, 32),
+    "upload": (4, 8),
+    "download": (64, 256),
+    "thumbnail": (2, 64),
+}
+EXEMPT_PATHS = {"/ready", "/admission", "/metrics"}  # 상태 확인은 제한하지 않음
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Limiter:
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float = QUEUE_TIMEOUT):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0  # 처리 중인 요청 수
+        self.waiting = 0  # 대기 중인 요청 수
+        self.rejected = 0  # 거절한 요청 수 (누적)
+        self._semaphore = asyncio.Semaphore(limit)
+
+    # 슬롯 획득, 대기열이 가득 찼거나 시간 안에 얻지 못하면 False
+    async def acquire(self) -> bool:
+        if not self._semaphore.locked():  # 빈 슬롯이 있으면 대기 없이 바로 획득
+            await self._semaphore.acquire()
+            self.active += 1
+            return True
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    # HTTP 요청이 아닌 작업용: 슬롯을 얻지 못하면 Overloaded
+    @asynccontextmanager
+    async def slot(self):
+        if not await self.acquire():
+            raise Overloaded(f"{self.name} queue is full")
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "active": self.active, "queued": self.waiting, "queue_size": self.queue_size, "rejected": self.rejected}
+
+
+def _limiter(name: str, limit: int, queue_size: int) -> Limiter:
+    key = name.upper()
+    return Limiter(
+        name,
+        int(os.getenv(f"ADMISSION_{key}_LIMIT", str(limit))),
+        int(os.getenv(f"ADMISSION_{key}_QUEUE", str(queue_size)))
+    )
+
+limiters: Dict[str, Limiter] = {name: _limiter(name, *sizes) for name, sizes in DEFAULT_LIMITS.items()}
+
+
+# 종류별 현재 상태 (대기열 길이 등)
+def stats() -> dict:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+# ASGI 요청을 종류로 분류
+def classify(scope: dict) -> str:
+    path = scope["path"]
+    method = scope["method"]
+    if method in ("GET", "HEAD"):
+        if path.startswith(("/files/", "/images/")):
+            return "download"
+        return "read"
+    for name, value in scope.get("headers", []):
+        if name == b"content-type" and value.startswith(b"multipart/form-data"):
+            return "upload"
+    return "write"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[classify(scope)]
+        if not await limiter.acquire():
+            body = json.dumps({"detail": "Server busy, retry later"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", RETRY_AFTER.encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
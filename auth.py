@@ -2,18 +2,35 @@
 ###################################로그인 기능###################################
 ################################API TEST COMPLETE###############################
 ################################################################################
+# /login에서 서명된 만료 토큰을 발급하고, 이후 요청은 Authorization: Bearer <토큰>으로 인증한다.
+# 토큰은 HMAC 검증만 하므로 비밀번호 해시 비용이 요청마다 들지 않는다.
+# 기존 클라이언트를 위해 HTTP Basic 인증도 계속 허용한다.
+# 비밀번호 환경 변수는 평문 또는 pbkdf2_sha256$반복횟수$salt$해시 형식 (python auth.py <비밀번호>로 생성)
 
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Form
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+from typing import Optional
+import base64
+import hashlib
+import hmac
+import json
+import logging
 import os
+import secrets
+import time
+from cache import TTLCache
 
 # .env 파일 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
-security = HTTPBasic()
+security = HTTPBasic(auto_error=False)
+bearer = HTTPBearer(auto_error=False)
 
 # 관리자 계정
 admin_accounts = {
@@ -21,34 +38,132 @@ admin_accounts = {
     "admin": os.getenv("ADMIN_PASSWORD")
 }
 
-# 권한 확인 함수
-def get_current_username(credentials: HTTPBasicCredentials = Depends(security)):
-    if credentials.username in admin_accounts and admin_accounts[credentials.username] == credentials.password:
+# 토큰 서명 키 (여러 워커가 같은 토큰을 검증하려면 반드시 설정, serve.py는 없으면 워커 1개로만 실행)
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    logger.warning("SESSION_SECRET is not set; tokens are valid only in this process (single worker only)")
+    SESSION_SECRET = secrets.token_urlsafe(32)
+TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", str(12 * 3600)))  # 초 단위
+PBKDF2_ITERATIONS = 600000
+
+# Basic 인증 성공 결과 캐시 (해시된 비밀번호 검증을 매 요청 반복하지 않도록)
+_basic_cache = TTLCache(maxsize=64, ttl=60)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+# 비밀번호 해시 생성
+def hash_password(password: str, iterations: int = PBKDF2_ITERATIONS) -> str:
+    salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
+    return f"pbkdf2_sha256${iterations}${salt}${_b64encode(digest)}"
+
+# 저장된 비밀번호(평문 또는 해시)와 비교
+def verify_password(password: str, stored: Optional[str]) -> bool:
+    if not stored:
+        return False
+    if stored.startswith("pbkdf2_sha256$"):
+        try:
+            _, iterations, salt, expected = stored.split("$")
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), int(iterations))
+        except ValueError:
+            return False
+        return hmac.compare_digest(_b64encode(digest), expected)
+    return hmac.compare_digest(password.encode(), stored.encode())
+
+def check_credentials(username: str, password: str) -> bool:
+    return username in admin_accounts and verify_password(password, admin_accounts[username])
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(SESSION_SECRET.encode(), payload.encode(), hashlib.sha256).digest())
+
+# 세션 토큰 발급: base64(내용).서명
+def issue_token(username: str, ttl: int = TOKEN_TTL) -> str:
+    payload = _b64encode(json.dumps({"sub": username, "exp": int(time.time()) + ttl}, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+# 토큰 검증, 유효하면 사용자 이름 반환
+def verify_token(token: str) -> Optional[str]:
+    payload, _, signature = token.partition(".")
+    if not signature or not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) < time.time() or claims.get("sub") not in admin_accounts:
+        return None
+    return claims["sub"]
+
+# 캐시는 이벤트 루프에서만 읽고 쓰고, 느린 해시 검증만 스레드에서 실행
+async def _verify_basic(credentials: HTTPBasicCredentials) -> Optional[str]:
+    key = hashlib.sha256(f"{credentials.username}:{credentials.password}".encode()).hexdigest()
+    if _basic_cache.get(key):
         return credentials.username
+    if await run_in_threadpool(check_credentials, credentials.username, credentials.password):
+        _basic_cache.set(key, True)
+        return credentials.username
+    return None
+
+
+# 요청의 인증 정보를 확인해 관리자 이름(또는 None)을 반환, 요청당 한 번만 검증
+async def resolve_user(
+        request: Request,
+        token: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+        credentials: Optional[HTTPBasicCredentials] = Depends(security)
+    ) -> Optional[str]:
+    if hasattr(request.state, "user"):
+        return request.state.user
+    user = None
+    if token is not None:
+        user = verify_token(token.credentials)
+    elif credentials is not None:
+        user = await _verify_basic(credentials)
+    request.state.user = user
+    return user
+
+# 권한 확인 함수
+async def get_current_username(user: Optional[str] = Depends(resolve_user)):
+    if user is not None:
+        return user
     else:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Basic"},
+            headers={"WWW-Authenticate": "Bearer, Basic"},
         )
 
 # 사용자 역할을 반환하는 함수
-def get_user_role(credentials: HTTPBasicCredentials = Depends(security)):
-    if credentials.username in admin_accounts and admin_accounts[credentials.username] == credentials.password:
-        return credentials.username
-    else:
-        return "user"
+async def get_user_role(user: Optional[str] = Depends(resolve_user)):
+    return user if user is not None else "user"
 
-# 로그인 엔드포인트
+# 로그인 엔드포인트, 세션 토큰 발급
 @router.post("/login")
 async def login(
-        username: str = Form(...), 
+        username: str = Form(...),
         password: str = Form(...)
     ):
-    if username in admin_accounts and admin_accounts[username] == password:
-        return JSONResponse(content={"message": "Login successful", "role": username})
+    if await run_in_threadpool(check_credentials, username, password):  # 해시 검증은 스레드에서
+        return JSONResponse(content={
+            "message": "Login successful",
+            "role": username,
+            "access_token": issue_token(username),
+            "token_type": "bearer",
+            "expires_in": TOKEN_TTL
+        })
     else:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
+
+if __name__ == "__main__":
+    # 환경 변수에 넣을 비밀번호 해시 생성
+    import sys
+    print(hash_password(sys.argv[1]))
@@ -0,0 +1,466 @@
+################################################################################
+################################라우트 벤치마크###################################
+################################################################################
+# main.app을 프로세스 안에서 ASGI(httpx.ASGITransport)로 직접 호출해 라우트별 성능을 잰다.
+#   python benchmarks/bench_routes.py                                   # 메모리 DB(mongomock_motor)
+#   python benchmarks/bench_routes.py --mongo-uri mongodb://localhost:27017  # 로컬 mongod
+#   python benchmarks/bench_routes.py --compare bench_routes-abc1234.json    # 이전 결과와 비교
+# 라우트별 처리량, p50/p95/p99 지연, 요청당 DB 왕복 수(mongod일 때만), 시나리오 중 RSS 증가량(Linux)을 JSON으로 저장한다.
+# 파일 저장소(files/, images/)는 임시 디렉터리를 사용하고, mongod는 --db-name 데이터베이스를 지운 뒤 시작한다.
+# 메모리 DB는 find()의 집계식 projection을 지원하지 않아 목록 조회가 문서 전체를 읽는다.
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = ["한미", "과학기술", "협력", "포럼", "동맹", "연구", "교육", "프로그램", "대학생", "연수",
+         "혁신", "전략", "정책", "기술", "인력", "정보", "지원", "STEM", "KUSTII", "2024"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="main.app 라우트 벤치마크")
+    parser.add_argument("--mongo-uri", help="로컬 mongod URI (없으면 mongomock_motor 사용)")
+    parser.add_argument("--db-name", default="kustii_bench", help="벤치마크용 데이터베이스 (시작 시 삭제)")
+    parser.add_argument("--posts", type=int, default=2000, help="게시판별 게시물 수")
+    parser.add_argument("--comments", type=int, default=500, help="긴 스레드 게시물의 최상위 댓글 수")
+    parser.add_argument("--replies", type=int, default=200, help="첫 댓글의 답글 수")
+    parser.add_argument("--attachment-mb", type=float, default=8, help="기존 게시물 첨부 파일 크기")
+    parser.add_argument("--upload-kb", type=int, default=512, help="작성 요청에 올리는 파일 크기")
+    parser.add_argument("--requests", type=int, default=300, help="조회 라우트별 요청 수")
+    parser.add_argument("--write-requests", type=int, default=30, help="쓰기 라우트별 요청 수")
+    parser.add_argument("--bulk-size", type=int, default=50, help="일괄 가져오기/삭제/수정 요청 하나의 항목 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: bench_routes-<commit>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# 현재 RSS (ru_maxrss는 프로세스 전체 최댓값이라 시나리오별로 구분되지 않는다), /proc이 없으면 None
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class RssSampler:
+    # 시나리오 동안 별도 스레드에서 현재 RSS를 주기적으로 읽어 시작 값과 최댓값을 기록
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.start = self.peak = current_rss_mb()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            rss = current_rss_mb()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def __enter__(self):
+        if self.start is not None:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.peak = max(self.peak, current_rss_mb()) if self.start is not None else None
+
+    def result(self) -> dict:
+        if self.start is None:
+            return {"rss_start_mb": None, "rss_peak_mb": None, "rss_delta_mb": None}
+        return {"rss_start_mb": round(self.start, 1), "rss_peak_mb": round(self.peak, 1), "rss_delta_mb": round(self.peak - self.start, 1)}
+
+
+def text(rng: random.Random, length: int) -> str:
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)
+
+
+def jpeg(width: int, height: int) -> bytes:
+    from PIL import Image
+    image = Image.effect_mandelbrot((width, height), (-2, -1.2, 1, 1.2), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def configure_environment(args):
+    # 앱 모듈을 import하기 전에 설정
+    os.environ.setdefault("SUPERADMIN_PASSWORD", "bench-superadmin")
+    os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+    os.environ.setdefault("SESSION_SECRET", "bench-secret")
+    os.environ["MONGODB_DB_NAME"] = args.db_name
+    if args.mongo_uri:
+        os.environ["MONGODB_URI"] = args.mongo_uri
+    os.environ.setdefault("JOB_WORKERS", "0")  # 썸네일 등 백그라운드 작업이 측정에 섞이지 않도록
+    os.environ.setdefault("VIEW_FLUSH_INTERVAL", "3600")
+    os.environ.setdefault("INDEX_CHECK_ON_STARTUP", "0")
+
+
+class CommandCounter:
+    # pymongo 명령 수 (DB 왕복 수)
+    def __init__(self):
+        from pymongo import monitoring
+
+        class Listener(monitoring.CommandListener):
+            def started(listener, event):
+                self.count += 1
+
+            def succeeded(listener, event):
+                pass
+
+            def failed(listener, event):
+                pass
+
+        self.count = 0
+        self.listener = Listener()
+
+
+################################################################################
+###################################테스트 데이터#################################
+################################################################################
+
+async def seed(db, args, rng: random.Random) -> dict:
+    import comments
+    import search
+    import setup_db
+    from counters import rebuild_counters
+    from fastapi import UploadFile
+    from storage import file_store
+
+    await setup_db.setup_db(db)  # 기본 문서, 인덱스
+
+    # 큰 첨부 파일 하나를 여러 게시물이 참조
+    # 폼 파서와 같은 임시 파일(SpooledTemporaryFile, 1MB 초과 시 디스크)로 만들어 라우터와 같은 경로로 저장
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as file:
+        file.write(os.urandom(int(args.attachment_mb * 1024 * 1024)))
+        file.seek(0)
+        attachment = (await file_store.put_uploads(db, [UploadFile(file, filename="자료집.pdf")]))[0]
+
+    fixtures = {}
+    for board in ["forum", "news"]:
+        posts = []
+        for number in range(1, args.posts + 1):
+            posts.append({
+                "title": text(rng, 30),
+                "content": text(rng, rng.randint(500, 3000)),
+                "files": [attachment] if number % 10 == 0 else [],
+                "comment_count": 0,
+                "views": rng.randint(0, 5000),
+                "number": number,
+            })
+        result = await db[board].insert_many(posts)
+        post_ids = [str(post_id) for post_id in result.inserted_ids]
+
+        # 긴 댓글 스레드
+        hot_post = result.inserted_ids[-1]
+        comment_ids = []
+        for _ in range(args.comments):
+            comment = await comments.add_comment(db, board, hot_post, "admin", text(rng, 80), True)
+            comment_ids.append(comment["_id"])
+        for _ in range(args.replies):
+            await comments.add_comment(db, board, hot_post, "admin", text(rng, 60), True, comment_ids[0])
+
+        # 삭제 요청 대상 (단건 삭제 write_requests개, 일괄 삭제 write_requests * bulk_size개)
+        delete_targets = await db[board].insert_many([
+            {"title": "삭제 대상", "content": text(rng, 200), "files": [], "comment_count": 0, "views": 0}
+            for _ in range(args.write_requests * (1 + args.bulk_size))
+        ])
+        delete_ids = [str(post_id) for post_id in delete_targets.inserted_ids]
+        comment_target_post = result.inserted_ids[0]
+        comment_targets = [
+            (await comments.add_comment(db, board, comment_target_post, "admin", "삭제 대상", True))["_id"]
+            for _ in range(args.write_requests)
+        ]
+        fixtures[board] = {
+            "post_ids": post_ids,
+            "hot_post": str(hot_post),
+            "first_comment": comment_ids[0],
+            "delete_targets": delete_ids[:args.write_requests],
+            "bulk_delete_targets": delete_ids[args.write_requests:],
+            "comment_target_post": str(comment_target_post),
+            "comment_targets": comment_targets,
+        }
+
+    media = await db["media"].insert_many([
+        {"title": text(rng, 30), "url": f"https://example.com/{i}.jpg", "files": [], "thumbnail": None, "thumbnail_status": "ready"}
+        for i in range(max(args.posts // 10, 1) + args.write_requests * (1 + args.bulk_size))
+    ])
+    media_ids = [str(post_id) for post_id in media.inserted_ids]
+    bulk_end = args.write_requests * (1 + args.bulk_size)
+    fixtures["media"] = {
+        "post_ids": media_ids[bulk_end:],
+        "delete_targets": media_ids[:args.write_requests],
+        "bulk_delete_targets": media_ids[args.write_requests:bulk_end],
+    }
+
+    await rebuild_counters(db, ["forum", "news"])
+    await search.rebuild_index(db, setup_db.BOARDS, setup_db.INDEXES)  # 시드 게시물 색인 (setup_db는 색인이 있으면 다시 만들지 않음)
+    return fixtures
+
+
+################################################################################
+###################################시나리오######################################
+################################################################################
+
+# 일괄 가져오기 본문 (NDJSON, 한 줄에 게시물 하나)
+def ndjson(rng: random.Random, count: int, media: bool = False) -> bytes:
+    if media:
+        items = [{"title": text(rng, 30), "url": f"https://example.com/import{i}.jpg"} for i in range(count)]
+    else:
+        items = [{"title": text(rng, 30), "content": text(rng, rng.randint(500, 3000))} for _ in range(count)]
+    return "\n".join(json.dumps(item, ensure_ascii=False) for item in items).encode()
+
+
+# (이름, 라우트 템플릿, 요청 수, 요청 생성 함수(i) -> (method, url, httpx 인자))
+def scenarios(args, fixtures: dict, rng: random.Random, auth: dict, upload: bytes, image: bytes) -> list:
+    reads, writes, size = args.requests, args.write_requests, args.bulk_size
+    password = os.environ["SUPERADMIN_PASSWORD"]
+    items = [
+        ("auth.login", ("POST", "/login"), reads,
+         lambda i: ("POST", "/login", {"data": {"username": "superadmin", "password": password}})),
+        ("introduction.get", ("GET", "/introduction/{type}"), reads,
+         lambda i: ("GET", "/introduction/hello", {"headers": {"accept": "image/webp"}})),
+        ("introduction.update", ("POST", "/introduction/{type}/update"), min(writes, 10),
+         lambda i: ("POST", "/introduction/hello/update", {
+             "headers": auth, "data": {"title": "인사말", "content": text(rng, 1000)},
+             "files": {"image": ("hello.jpg", image, "image/jpeg")}})),
+    ]
+
+    for prefix, board in [("/mainbusiness", "forum"), ("/notice", "news")]:
+        data = fixtures[board]
+        name = prefix.strip("/")
+        deep_page = max(args.posts // 20 // 2, 1)
+        items += [
+            (f"{name}.list", ("GET", f"{prefix}/{{type}}"), reads,
+             lambda i, prefix=prefix, board=board: ("GET", f"{prefix}/{board}", {"params": {"page": 1, "limit": 20}})),
+            (f"{name}.list_deep_page", ("GET", f"{prefix}/{{type}}"), reads,
+             lambda i, prefix=prefix, board=board, deep_page=deep_page: ("GET", f"{prefix}/{board}", {"params": {"page": deep_page, "limit": 20}})),
+            (f"{name}.list_cursor", ("GET", f"{prefix}/{{type}}"), reads,
+             lambda i, prefix=prefix, board=board, data=data: ("GET", f"{prefix}/{board}", {"params": {"limit": 20, "cursor": data.get("cursor")}})),
+            (f"{name}.get", ("GET", f"{prefix}/{{type}}/{{post_id}}"), reads,
+             lambda i, prefix=prefix, board=board, data=data: ("GET", f"{prefix}/{board}/{rng.choice(data['post_ids'])}", {})),
+            (f"{name}.comments", ("GET", f"{prefix}/{{type}}/{{post_id}}/comments"), reads,
+             lambda i, prefix=prefix, board=board, data=data: ("GET", f"{prefix}/{board}/{data['hot_post']}/comments", {"params": {"limit": 50}})),
+            (f"{name}.replies", ("GET", f"{prefix}/{{type}}/{{post_id}}/comments/{{comment_id}}/replies"), reads,
+             lambda i, prefix=prefix, board=board, data=data: ("GET", f"{prefix}/{board}/{data['hot_post']}/comments/{data['first_comment']}/replies", {"params": {"limit": 50}})),
+            (f"{name}.create", ("POST", f"{prefix}/{{type}}/create"), writes,
+             lambda i, prefix=prefix, board=board: ("POST", f"{prefix}/{board}/create", {
+                 "headers": auth, "data": {"title": text(rng, 30), "content": text(rng, 2000)},
+                 "files": {"files": (f"upload{i}.bin", upload + str(i).encode(), "application/octet-stream")}})),
+            (f"{name}.update", ("PUT", f"{prefix}/{{type}}/{{post_id}}/update"), writes,
+             lambda i, prefix=prefix, board=board, data=data: ("PUT", f"{prefix}/{board}/{rng.choice(data['post_ids'][:-1])}/update", {
+                 "headers": auth, "data": {"title": text(rng, 30), "content": text(rng, 2000)}})),
+            (f"{name}.delete", ("DELETE", f"{prefix}/{{type}}/{{post_id}}/delete"), writes,
+             lambda i, prefix=prefix, board=board, data=data: ("DELETE", f"{prefix}/{board}/{data['delete_targets'][i]}/delete", {"headers": auth})),
+            (f"{name}.comment_create", ("POST", f"{prefix}/{{type}}/{{post_id}}/comments"), writes,
+             lambda i, prefix=prefix, board=board, data=data: ("POST", f"{prefix}/{board}/{data['hot_post']}/comments", {
+                 "headers": auth, "json": {"content": text(rng, 80)}})),
+            (f"{name}.comment_delete", ("DELETE", f"{prefix}/{{type}}/{{post_id}}/comments/{{comment_id}}"), writes,
+             lambda i, prefix=prefix, board=board, data=data: ("DELETE", f"{prefix}/{board}/{data['comment_target_post']}/comments/{data['comment_targets'][i]}", {"headers": auth})),
+            (f"{name}.bulk_import", ("POST", f"{prefix}/{{type}}/bulk/import"), writes,
+             lambda i, prefix=prefix, board=board: ("POST", f"{prefix}/{board}/bulk/import", {
+                 "headers": {**auth, "content-type": "application/x-ndjson"}, "content": ndjson(rng, size)})),
+            (f"{name}.bulk_update", ("POST", f"{prefix}/{{type}}/bulk/update"), writes,
+             lambda i, prefix=prefix, board=board, data=data: ("POST", f"{prefix}/{board}/bulk/update", {
+                 "headers": auth, "json": {"posts": [{"_id": post_id, "title": text(rng, 30)} for post_id in rng.sample(data["post_ids"][:-1], size)]}})),
+            (f"{name}.bulk_delete", ("POST", f"{prefix}/{{type}}/bulk/delete"), writes,
+             lambda i, prefix=prefix, board=board, data=data: ("POST", f"{prefix}/{board}/bulk/delete", {
+                 "headers": auth, "json": {"ids": data["bulk_delete_targets"][i * size:(i + 1) * size]}})),
+        ]
+
+    media = fixtures["media"]
+    items += [
+        ("mediacenter.get", ("GET", "/mediacenter/{type}/{post_id}"), reads,
+         lambda i: ("GET", f"/mediacenter/media/{rng.choice(media['post_ids'])}", {})),
+        ("mediacenter.create", ("POST", "/mediacenter/{type}/create"), writes,
+         lambda i: ("POST", "/mediacenter/media/create", {
+             "headers": auth, "data": {"title": text(rng, 30), "url": "https://example.com/video"},
+             "files": {"files": (f"thumb{i}.jpg", image, "image/jpeg")}})),
+        ("mediacenter.update", ("PUT", "/mediacenter/{type}/{post_id}/update"), writes,
+         lambda i: ("PUT", f"/mediacenter/media/{rng.choice(media['post_ids'])}/update", {
+             "headers": auth, "data": {"title": text(rng, 30), "url": "https://example.com/video"},
+             "files": {"files": (f"thumb{i}.jpg", image, "image/jpeg")}})),
+        ("mediacenter.delete", ("DELETE", "/mediacenter/{type}/{post_id}/delete"), writes,
+         lambda i: ("DELETE", f"/mediacenter/media/{media['delete_targets'][i]}/delete", {"headers": auth})),
+        ("mediacenter.bulk_import", ("POST", "/mediacenter/{type}/bulk/import"), writes,
+         lambda i: ("POST", "/mediacenter/media/bulk/import", {
+             "headers": {**auth, "content-type": "application/x-ndjson"}, "content": ndjson(rng, size, media=True)})),
+        ("mediacenter.bulk_update", ("POST", "/mediacenter/{type}/bulk/update"), writes,
+         lambda i: ("POST", "/mediacenter/media/bulk/update", {
+             "headers": auth, "json": {"posts": [{"_id": post_id, "title": text(rng, 30)} for post_id in rng.sample(media["post_ids"], min(size, len(media["post_ids"])))]}})),
+        ("mediacenter.bulk_delete", ("POST", "/mediacenter/{type}/bulk/delete"), writes,
+         lambda i: ("POST", "/mediacenter/media/bulk/delete", {
+             "headers": auth, "json": {"ids": media["bulk_delete_targets"][i * size:(i + 1) * size]}})),
+    ]
+    return items
+
+
+# 벤치마크 대상 라우터의 모든 라우트 (method, 경로)
+def declared_routes() -> set:
+    import auth, introduction, main_business, notice, media_center
+    routes = set()
+    for router, prefix in [(auth.router, ""), (introduction.router, "/introduction"), (main_business.router, "/mainbusiness"),
+                           (notice.router, "/notice"), (media_center.router, "/mediacenter")]:
+        for route in router.routes:
+            for method in route.methods:
+                routes.add((method, prefix + route.path))
+    return routes
+
+
+async def run_scenario(client, count: int, make_request, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(i: int):
+        method, url, kwargs = make_request(i)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "statuses": {str(status): number for status, number in sorted(statuses.items())},
+    }
+
+
+async def benchmark(args) -> dict:
+    import httpx
+    import database
+
+    counter = None
+    if args.mongo_uri:
+        counter = CommandCounter()
+        database.add_listener(counter.listener)
+        client = database.create_client()
+        await client.drop_database(args.db_name)
+        client.close()
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        async def no_ping():  # 메모리 DB에는 연결 풀이 없다
+            pass
+        database.client = AsyncMongoMockClient()
+        database.warm_pool = no_ping
+        import feed, main_business, notice, search
+        for module in (main_business, notice, feed, search):
+            module.SUMMARY_PROJECTION = None
+
+    import main
+    rng = random.Random(args.seed)
+    results = {}
+    async with main.lifespan(main.app):
+        db = database.get_db()
+        print("seeding...", flush=True)
+        fixtures = await seed(db, args, rng)
+        upload = os.urandom(args.upload_kb * 1024)
+        image = jpeg(2400, 1600)
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            password = os.environ["SUPERADMIN_PASSWORD"]
+            token = (await client.post("/login", data={"username": "superadmin", "password": password})).json()["access_token"]
+            auth = {"Authorization": f"Bearer {token}"}
+            for board, prefix in [("forum", "/mainbusiness"), ("news", "/notice")]:
+                page = (await client.get(f"{prefix}/{board}", params={"limit": 20})).json()
+                fixtures[board]["cursor"] = page.get("next_cursor")
+
+            items = scenarios(args, fixtures, rng, auth, upload, image)
+            uncovered = declared_routes() - {route for _, route, _, _ in items}
+            for method, path in sorted(uncovered):
+                print(f"warning: no scenario for {method} {path}")
+
+            for name, route, count, make_request in items:
+                before = counter.count if counter else 0
+                with RssSampler() as rss:
+                    result = await run_scenario(client, count, make_request, args.concurrency)
+                result["route"] = " ".join(route)
+                result["db_round_trips"] = round((counter.count - before) / count, 2) if counter else None
+                result.update(rss.result())
+                results[name] = result
+                print(f"{name:<32}{result['throughput_rps']:>9.1f} rps  p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  "
+                      f"p99 {result['p99_ms']:>8.2f} ms  db {result['db_round_trips']}  rss +{result['rss_delta_mb']} MB (peak {result['rss_peak_mb']})  {result['statuses']}", flush=True)
+    return results
+
+
+def compare(current: dict, previous_path: str):
+    with open(previous_path, encoding="utf-8") as file:
+        previous = json.load(file)
+    print(f"\ncompared with {previous.get('commit')} ({previous_path})")
+    for name, result in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            continue
+        p95 = (result["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0
+        rps = (result["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0
+        print(f"{name:<32} p95 {p95:+7.1f}%  throughput {rps:+7.1f}%")
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    output = os.path.abspath(args.output or f"bench_routes-{git_commit()}.json")
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    with tempfile.TemporaryDirectory(prefix="kustii-bench-") as workdir:
+        os.chdir(workdir)  # 업로드 파일은 임시 디렉터리에 저장
+        results = asyncio.run(benchmark(args))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "backend": "mongod" if args.mongo_uri else "mongomock_motor",
+        "python": sys.version.split()[0],
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"saved {output}")
+    if compare_path:
+        compare(report, compare_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+################################################################################
+#############################응답 직렬화 마이크로벤치마크##########################
+################################################################################
+# 기본 경로(response_model 검증 + jsonable_encoder + json.dumps)와
+# serialization.py의 빠른 경로(최상위 키 선택 + orjson/json)를 같은 데이터로 비교한다.
+#   python benchmarks/bench_serialization.py [--number 200]
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from main_business import BusinessPost, BusinessPostListResponse, CommentListResponse
+from serialization import dumps, model_keys, shape, orjson
+
+
+def list_page(size: int) -> dict:
+    return {
+        "posts": [{
+            "_id": str(ObjectId()),
+            "number": i,
+            "title": f"게시물 제목 {i}",
+            "excerpt": "한미 과학기술 협력에 관한 본문 미리보기 " * 5,
+            "views": i * 7,
+            "file_count": i % 3,
+            "comment_count": i % 11,
+            "has_files": i % 3 > 0,
+        } for i in range(size)],
+        "total_pages": 100,
+        "current_page": 1,
+        "next_cursor": "eyJpZCI6IjAiLCJwIjoyLCJkIjoibmV4dCJ9",
+        "prev_cursor": None,
+    }
+
+
+def post_detail(files: int) -> dict:
+    return {
+        "_id": str(ObjectId()),
+        "title": "게시물 제목",
+        "content": "본문 " * 1500,
+        "files": [{"blob_id": "ab" * 32, "filename": f"첨부{i}.pdf", "path": f"files/ab/ab/{'ab' * 32}", "size": 1024 * i} for i in range(files)],
+        "comment_count": 40,
+        "views": 1234,
+        "number": 77,
+    }
+
+
+def comment_page(size: int) -> dict:
+    now = datetime.now(timezone.utc)
+    post_id = ObjectId()
+    return {
+        "comments": [{
+            "_id": str(ObjectId()),
+            "post_id": str(post_id),
+            "parent_id": None,
+            "depth": 0,
+            "user": "admin",
+            "content": f"댓글 내용 {i}",
+            "is_admin": True,
+            "reply_count": i % 4,
+            "created_at": now,
+        } for i in range(size)],
+        "next_cursor": str(ObjectId()),
+    }
+
+
+# FastAPI 기본 응답 경로와 같은 단계
+def validated(model, content) -> bytes:
+    value = jsonable_encoder(model(**content), by_alias=True)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def trusted(keys, content) -> bytes:
+    return dumps(shape(content, keys))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200, help="측정당 반복 횟수")
+    args = parser.parse_args()
+
+    cases = [
+        ("list 50 posts", BusinessPostListResponse, list_page(50)),
+        ("post detail, 10 files", BusinessPost, post_detail(10)),
+        ("100 comments", CommentListResponse, comment_page(100)),
+    ]
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'case':<24}{'validated (us)':>16}{'trusted (us)':>16}{'speedup':>10}")
+    for name, model, content in cases:
+        keys = model_keys(model)
+        slow = min(timeit.repeat(lambda: validated(model, content), number=args.number, repeat=5)) / args.number
+        fast = min(timeit.repeat(lambda: trusted(keys, content), number=args.number, repeat=5)) / args.number
+        print(f"{name:<24}{slow * 1e6:>16.1f}{fast * 1e6:>16.1f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
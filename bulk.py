@@ -0,0 +1,302 @@
+################################################################################
+###################################일괄 작업#####################################
+################################################################################
+# 게시판 라우터(main_business, notice, media_center)의 일괄 가져오기/삭제/수정.
+#   POST /{type}/bulk/import : NDJSON 본문 (한 줄에 게시물 하나), IMPORT_BATCH_SIZE개씩 insert_many
+#                              (줄은 MAX_LINE_SIZE, 본문은 MAX_IMPORT_SIZE까지만 읽는다)
+#   POST /{type}/bulk/delete : {"ids": [...]}, ID마다 find_one_and_delete를 동시에 (실제로 지운 게시물만 정리)
+#   POST /{type}/bulk/update : {"posts": [{"_id": ..., "title": ...}, ...]}, UpdateOne들을 bulk_write 한 번으로
+# 결과는 항목마다 (줄 번호 또는 목록 순서, _id, 상태, 오류 내용)로 돌려준다.
+# 글 번호/게시물 수와 첨부 파일 참조는 여기서, 검색 색인/댓글/피드/썸네일은 라우터가 넘기는 후처리 함수로
+# 단건 API와 같은 규칙으로 갱신한다.
+
+from pydantic import BaseModel, Field, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Type
+import asyncio
+import json
+import os
+from fastapi import HTTPException
+from storage import file_store, blob_ids
+from counters import reserve_post_numbers, decrement_post_count
+from cache import feed_cache
+from search import index_posts, remove_posts
+import comments as comment_store
+
+IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))  # insert_many 한 번에 넣을 게시물 수
+MAX_LINE_SIZE = int(os.getenv("BULK_IMPORT_MAX_LINE_SIZE", str(1024 * 1024)))  # 가져오기 한 줄의 최대 바이트 수 (1MB)
+MAX_IMPORT_SIZE = int(os.getenv("BULK_IMPORT_MAX_SIZE", str(100 * 1024 * 1024)))  # 가져오기 본문 전체의 최대 바이트 수 (100MB)
+MAX_ITEMS = 1000  # 삭제/수정 요청 하나에 담을 수 있는 최대 항목 수
+
+# 게시물 목록을 받아 후처리하는 함수 (검색 색인, 썸네일 작업 등)
+Hook = Callable[[AsyncIOMotorDatabase, str, List[dict]], Awaitable[None]]
+
+
+class BulkItemResult(BaseModel):
+    index: int  # 가져오기: 줄 번호(1부터), 삭제/수정: 목록 순서(0부터)
+    id: Optional[str] = Field(None, alias="_id")
+    status: str  # created, updated, deleted, not_found, error
+    detail: Optional[str] = None  # 오류 내용
+    class Config:
+        allow_population_by_field_name = True
+
+class BulkResult(BaseModel):
+    succeeded: int = Field(..., description="성공한 항목 수")
+    failed: int = Field(..., description="실패한 항목 수 (없는 게시물 포함)")
+    results: List[BulkItemResult] = Field(..., description="항목별 결과")
+
+class BulkIds(BaseModel):
+    ids: List[str]
+
+class BulkUpdate(BaseModel):
+    posts: List[Dict[str, Any]]  # 항목마다 _id와 바꿀 필드 (라우터의 수정 모델로 검증)
+
+
+def _result(index: int, status: str, post_id: Any = None, detail: Optional[str] = None) -> dict:
+    return {"index": index, "_id": str(post_id) if post_id is not None else None, "status": status, "detail": detail}
+
+
+def _summary(results: List[dict]) -> dict:
+    failed = sum(1 for result in results if result["status"] in ("error", "not_found"))
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
+
+
+def _fields(model: BaseModel, exclude_unset: bool = True) -> dict:
+    if hasattr(model, "model_dump"):  # pydantic v2
+        return model.model_dump(exclude_unset=exclude_unset)
+    return model.dict(exclude_unset=exclude_unset)
+
+
+def _error_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+
+def _write_errors(error: BulkWriteError) -> Dict[int, str]:
+    return {item["index"]: item.get("errmsg", "write error") for item in error.details.get("writeErrors", [])}
+
+
+def _check_size(items: list):
+    if len(items) > MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items (max {MAX_ITEMS})")
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+# 요청 본문을 줄 단위로 읽기 (본문 전체를 메모리에 올리지 않음)
+# MAX_LINE_SIZE를 넘는 줄은 버퍼에 쌓지 않고 건너뛰며 None을 내보내고,
+# 본문이 MAX_IMPORT_SIZE를 넘으면 더 읽지 않고 _BodyTooLarge
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    buffer = bytearray()
+    skipping = False  # 너무 긴 줄의 나머지를 버리는 중
+    total = 0
+    async for chunk in stream:
+        total += len(chunk)
+        if total > MAX_IMPORT_SIZE:
+            raise _BodyTooLarge()
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not skipping:
+                    buffer += chunk[start:]
+                    if len(buffer) > MAX_LINE_SIZE:
+                        buffer.clear()
+                        skipping = True
+                break
+            if skipping:
+                skipping = False
+                yield None
+            else:
+                buffer += chunk[start:end]
+                yield bytes(buffer) if len(buffer) <= MAX_LINE_SIZE else None
+                buffer.clear()
+            start = end + 1
+    if skipping:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+async def _insert_batch(
+        db: AsyncIOMotorDatabase, board: str, batch: List[tuple], numbered: bool,
+        after_insert: Optional[Hook], results: List[dict]
+    ):
+    posts = [post for _, post in batch]
+    if numbered:  # 글 번호를 한 번에 예약 (실패한 항목의 번호는 비워 둔다)
+        first = await reserve_post_numbers(db, board, len(posts))
+        for offset, post in enumerate(posts):
+            post["number"] = first + offset
+    errors: Dict[int, str] = {}
+    try:
+        await db[board].insert_many(posts, ordered=False)  # _id는 드라이버가 posts에 채운다
+    except BulkWriteError as error:
+        errors = _write_errors(error)
+    except PyMongoError:  # 연결 끊김, 시간 초과 등: 배치 전체를 실패로 보고 예약한 게시물 수를 되돌린다
+        errors = {position: "Database error" for position in range(len(posts))}
+    if numbered and errors:
+        await decrement_post_count(db, board, len(errors))
+    created = []
+    for position, (line_number, post) in enumerate(batch):
+        if position in errors:
+            results.append(_result(line_number, "error", detail=errors[position]))
+        else:
+            results.append(_result(line_number, "created", post["_id"]))
+            created.append(post)
+    if created and after_insert is not None:
+        await after_insert(db, board, created)
+
+
+# NDJSON 일괄 가져오기: 줄마다 model로 검증하고 defaults를 채워 IMPORT_BATCH_SIZE개씩 삽입
+async def import_posts(
+        db: AsyncIOMotorDatabase, board: str, stream: AsyncIterator[bytes], model: Type[BaseModel],
+        defaults: dict, numbered: bool, after_insert: Optional[Hook] = None
+    ) -> dict:
+    results: List[dict] = []
+    batch: List[tuple] = []  # (줄 번호, 게시물)
+    line_number = 0
+    lines = _lines(stream)
+    while True:
+        try:
+            line = await lines.__anext__()
+        except StopAsyncIteration:
+            break
+        except _BodyTooLarge:  # 이미 넣은 게시물의 결과는 그대로 돌려주고 나머지는 읽지 않음
+            results.append(_result(line_number + 1, "error", detail=f"Request body too large (max {MAX_IMPORT_SIZE} bytes), remaining lines were not read"))
+            break
+        line_number += 1
+        if line is None:
+            results.append(_result(line_number, "error", detail=f"Line too long (max {MAX_LINE_SIZE} bytes)"))
+            continue
+        if not line.strip():
+            continue
+        try:
+            item = model(**json.loads(line))
+        except ValueError as error:  # JSON 오류, 검증 오류(ValidationError도 ValueError)
+            detail = _error_detail(error) if isinstance(error, ValidationError) else "Invalid JSON"
+            results.append(_result(line_number, "error", detail=detail))
+            continue
+        except TypeError:  # 객체가 아닌 JSON 값
+            results.append(_result(line_number, "error", detail="Each line must be a JSON object"))
+            continue
+        batch.append((line_number, {**defaults, **_fields(item, exclude_unset=False)}))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _insert_batch(db, board, batch, numbered, after_insert, results)
+            batch = []
+    if batch:
+        await _insert_batch(db, board, batch, numbered, after_insert, results)
+    return _summary(sorted(results, key=lambda result: result["index"]))
+
+
+# ID 목록 일괄 삭제: 첨부 파일 참조를 해제하고 after_delete로 색인/댓글 정리
+# 같은 게시물을 동시에 지우는 다른 요청(단건/일괄)과 겹쳐도 문서를 실제로 지운 요청만
+# 게시물 수, 첨부 파일 참조, 색인/댓글을 정리하도록 ID마다 find_one_and_delete로 지운다.
+async def delete_posts(
+        db: AsyncIOMotorDatabase, board: str, ids: List[str], numbered: bool,
+        after_delete: Optional[Hook] = None
+    ) -> dict:
+    _check_size(ids)
+    results: List[Optional[dict]] = [None] * len(ids)
+    targets: Dict[ObjectId, int] = {}  # ObjectId -> 목록 순서
+    for index, post_id in enumerate(ids):
+        try:
+            object_id = ObjectId(post_id)
+        except (InvalidId, TypeError):
+            results[index] = _result(index, "error", post_id, "Invalid id")
+            continue
+        if object_id in targets:  # 같은 ID가 목록에 두 번 있으면 한 번만 삭제
+            results[index] = _result(index, "error", object_id, "Duplicate id")
+        else:
+            targets[object_id] = index
+
+    removed = await asyncio.gather(
+        *(db[board].find_one_and_delete({"_id": object_id}, projection={"files": 1}) for object_id in targets),
+        return_exceptions=True
+    )
+    deleted = []
+    for (object_id, index), post in zip(targets.items(), removed):
+        if isinstance(post, PyMongoError):
+            results[index] = _result(index, "error", object_id, str(post))
+        elif isinstance(post, BaseException):
+            raise post
+        elif post is None:  # 없거나 다른 요청이 먼저 지운 게시물
+            results[index] = _result(index, "not_found", object_id)
+        else:
+            results[index] = _result(index, "deleted", object_id)
+            deleted.append(post)
+
+    if deleted:
+        if numbered:
+            await decrement_post_count(db, board, len(deleted))
+        await file_store.release_all(db, [blob_id for post in deleted for blob_id in blob_ids(post.get("files"))])
+        if after_delete is not None:
+            await after_delete(db, board, deleted)
+    return _summary(results)
+
+
+# 항목별 부분 수정: model로 검증한 필드만 $set (첨부 파일은 단건 수정 API로)
+async def update_posts(
+        db: AsyncIOMotorDatabase, board: str, items: List[Dict[str, Any]], model: Type[BaseModel],
+        after_update: Optional[Hook] = None
+    ) -> dict:
+    _check_size(items)
+    results: List[Optional[dict]] = [None] * len(items)
+    targets = []  # (목록 순서, ObjectId, 바꿀 필드)
+    for index, item in enumerate(items):
+        post_id = item.get("_id", item.get("id"))
+        if not isinstance(post_id, str):  # ObjectId(None)은 새 ID를 만들어 버린다
+            results[index] = _result(index, "error", None, "Invalid id")
+            continue
+        try:
+            object_id = ObjectId(post_id)
+            fields = _fields(model(**{key: value for key, value in item.items() if key not in ("_id", "id")}))
+        except (InvalidId, TypeError):
+            results[index] = _result(index, "error", post_id, "Invalid id")
+            continue
+        except ValidationError as error:
+            results[index] = _result(index, "error", post_id, _error_detail(error))
+            continue
+        if not fields:
+            results[index] = _result(index, "error", post_id, "No fields to update")
+            continue
+        targets.append((index, object_id, fields))
+
+    errors: Dict[int, str] = {}
+    if targets:
+        try:
+            await db[board].bulk_write([UpdateOne({"_id": object_id}, {"$set": fields}) for _, object_id, fields in targets], ordered=False)
+        except BulkWriteError as error:
+            errors = _write_errors(error)
+
+    updated = {
+        post["_id"]: post
+        async for post in db[board].find({"_id": {"$in": [object_id for _, object_id, _ in targets]}}, {"title": 1, "content": 1})
+    }
+    for position, (index, object_id, _) in enumerate(targets):
+        if position in errors:
+            results[index] = _result(index, "error", object_id, errors[position])
+        elif object_id in updated:
+            results[index] = _result(index, "updated", object_id)
+        else:
+            results[index] = _result(index, "not_found", object_id)
+
+    if updated and after_update is not None:
+        await after_update(db, board, list(updated.values()))
+    return _summary(results)
+
+
+# 글 게시판(main_business, notice) 후처리: 검색 색인, 댓글, 최신 게시물 피드
+async def index_board_posts(db: AsyncIOMotorDatabase, board: str, posts: List[dict]):
+    await index_posts(db, board, posts)
+    await feed_cache.bump(db)
+
+async def cleanup_board_posts(db: AsyncIOMotorDatabase, board: str, posts: List[dict]):
+    post_ids = [post["_id"] for post in posts]
+    await comment_store.delete_posts_comments(db, board, post_ids)
+    await remove_posts(db, board, post_ids)
+    await feed_cache.bump(db)
@@ -0,0 +1,109 @@
+################################################################################
+##################################메모리 캐시####################################
+################################################################################
+# 프로세스 내 읽기 캐시 (TTL 만료 + 최대 개수 초과 시 LRU 제거)와
+# 응답 ETag 계산/비교 함수
+# 여러 워커가 같은 데이터를 캐시하는 경우(SharedCache) 데이터를 바꾼 워커가 MongoDB의
+# cache_versions 문서 버전을 올리고, 다른 워커는 REVALIDATE_INTERVAL마다 버전만 읽어
+# 바뀌었으면 자기 캐시를 비운다.
+#   { "_id": "feed", "v": 12 }
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_TTL = float(os.getenv("CACHE_TTL", "300"))  # 초 단위
+DEFAULT_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "256"))
+REVALIDATE_INTERVAL = float(os.getenv("CACHE_REVALIDATE_INTERVAL", "1"))  # 다른 워커의 수정을 확인하는 간격(초)
+VERSIONS_COLLECTION = "cache_versions"
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (만료 시각, 값)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)  # 최근 사용 항목으로 이동
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)  # 가장 오래 사용되지 않은 항목 제거
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCache(TTLCache):
+    def __init__(self, name: str, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL, interval: float = REVALIDATE_INTERVAL):
+        super().__init__(maxsize, ttl)
+        self.name = name
+        self.interval = interval
+        self._version: Optional[int] = None  # 캐시 내용이 기준으로 삼는 버전
+        self._checked_at = float("-inf")
+
+    # 조회 전에 호출: interval이 지났으면 버전만 읽고(_id 조회) 바뀌었으면 캐시를 비운다
+    async def revalidate(self, db):
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return
+        self._checked_at = now
+        document = await db[VERSIONS_COLLECTION].find_one({"_id": self.name}, {"v": 1})
+        version = document["v"] if document else 0
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    # 데이터를 바꾼 뒤 호출: 이 워커의 캐시를 비우고 다른 워커에 알림
+    async def bump(self, db):
+        self.clear()
+        await db[VERSIONS_COLLECTION].update_one({"_id": self.name}, {"$inc": {"v": 1}}, upsert=True)
+        self._checked_at = float("-inf")  # 다음 조회에서 새 버전을 읽는다
+
+
+# 응답 데이터로부터 강한(strong) ETag 생성
+def make_etag(data: Any) -> str:
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(payload.encode()).hexdigest()[:32] + '"'
+
+
+# If-None-Match 헤더가 현재 ETag와 일치하는지 확인 (weak 비교)
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+# 메인 페이지 최신 게시물 피드 캐시 (feed.py), 게시판 글 작성/수정/삭제 시 bump로 모든 워커에서 비운다
+# 게시판 라우터와 feed.py가 서로 import하지 않도록 여기에 둔다
+feed_cache = SharedCache("feed", maxsize=8, ttl=float(os.getenv("FEED_CACHE_TTL", "60")))
@@ -0,0 +1,186 @@
+################################################################################
+###################################댓글 저장소###################################
+################################################################################
+# 댓글은 게시물 문서에 포함하지 않고 comments 컬렉션에만 저장한다.
+#   { "board": "forum", "post_id": ObjectId, "parent_id": ObjectId | None,
+#     "path": "<조상 id>/<조상 id>/", "depth": 1, "user": "...", "content": "...",
+#     "is_admin": False, "reply_count": 0, "created_at": datetime }
+# 게시물 문서에는 comment_count만 유지하고, 각 댓글에는 직계 답글 수(reply_count)를 유지한다.
+# 목록은 (board, post_id, parent_id, _id) 인덱스로, 하위 스레드 삭제는 path 인덱스로 처리한다.
+
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import hashlib
+import re
+
+COLLECTION = "comments"
+MAX_LIMIT = 100
+
+
+def _object_id(value: str, detail: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail=detail)
+
+
+# 응답용으로 ObjectId를 문자열로 변환
+def format_comment(comment: dict) -> dict:
+    comment["_id"] = str(comment["_id"])
+    comment["post_id"] = str(comment["post_id"])
+    if comment.get("parent_id") is not None:
+        comment["parent_id"] = str(comment["parent_id"])
+    return comment
+
+
+# 댓글(또는 parent_id가 있으면 답글) 추가
+async def add_comment(
+        db: AsyncIOMotorDatabase,
+        board: str,
+        post_id: ObjectId,
+        user: str,
+        content: str,
+        is_admin: bool,
+        parent_id: Optional[str] = None
+    ) -> dict:
+    comment = {
+        "board": board,
+        "post_id": post_id,
+        "parent_id": None,
+        "path": "",
+        "depth": 0,
+        "user": user,
+        "content": content,
+        "is_admin": is_admin,
+        "reply_count": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+    if parent_id:
+        parent = await db[COLLECTION].find_one(
+            {"_id": _object_id(parent_id, "Parent comment not found"), "board": board, "post_id": post_id},
+            {"path": 1, "depth": 1}
+        )
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+        comment["parent_id"] = parent["_id"]
+        comment["path"] = f"{parent['path']}{parent['_id']}/"
+        comment["depth"] = parent["depth"] + 1
+
+    result = await db[COLLECTION].insert_one(comment)
+    comment["_id"] = result.inserted_id
+    if comment["parent_id"] is not None:
+        await db[COLLECTION].update_one({"_id": comment["parent_id"]}, {"$inc": {"reply_count": 1}})
+    await db[board].update_one({"_id": post_id}, {"$inc": {"comment_count": 1}})
+    return format_comment(comment)
+
+
+# 댓글 한 페이지 조회 (작성순), parent_id가 없으면 최상위 댓글
+# cursor는 이전 페이지 마지막 댓글의 id
+async def list_comments(
+        db: AsyncIOMotorDatabase,
+        board: str,
+        post_id: ObjectId,
+        parent_id: Optional[ObjectId] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[dict], Optional[str]]:
+    limit = min(max(limit, 1), MAX_LIMIT)
+    query = {"board": board, "post_id": post_id, "parent_id": parent_id}
+    if cursor:
+        try:
+            query["_id"] = {"$gt": ObjectId(cursor)}
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    comments = await db[COLLECTION].find(query, {"path": 0, "board": 0}).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = str(comments[limit - 1]["_id"]) if len(comments) > limit else None
+    return [format_comment(comment) for comment in comments[:limit]], next_cursor
+
+
+# 댓글과 그 하위 답글 전체 삭제, 삭제된 댓글 수 반환
+async def delete_comment(db: AsyncIOMotorDatabase, board: str, post_id: ObjectId, comment_id: str) -> int:
+    comment = await db[COLLECTION].find_one(
+        {"_id": _object_id(comment_id, "Comment not found"), "board": board, "post_id": post_id},
+        {"path": 1, "parent_id": 1}
+    )
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    subtree_prefix = re.escape(f"{comment['path']}{comment['_id']}/")
+    result = await db[COLLECTION].delete_many({"$or": [
+        {"_id": comment["_id"]},
+        {"path": {"$regex": f"^{subtree_prefix}"}},  # 접두사 검색이므로 path 인덱스 사용
+    ]})
+    if comment.get("parent_id") is not None:
+        await db[COLLECTION].update_one({"_id": comment["parent_id"]}, {"$inc": {"reply_count": -1}})
+    await db[board].update_one({"_id": post_id}, {"$inc": {"comment_count": -result.deleted_count}})
+    return result.deleted_count
+
+
+# 게시물 삭제 시 해당 게시물의 댓글 전체 삭제
+async def delete_post_comments(db: AsyncIOMotorDatabase, board: str, post_id: ObjectId):
+    await db[COLLECTION].delete_many({"board": board, "post_id": post_id})
+
+
+# 일괄 삭제 시 여러 게시물의 댓글 전체 삭제
+async def delete_posts_comments(db: AsyncIOMotorDatabase, board: str, post_ids: List[ObjectId]):
+    await db[COLLECTION].delete_many({"board": board, "post_id": {"$in": post_ids}})
+
+
+# 옮기는 답글의 _id: 부모 댓글 작성 시각 + 부모 댓글 해시 + 순서
+# 다시 실행해도 같은 값이라 중복되지 않고, _id 순 목록에서 원래 순서대로, 이후 새 답글보다 앞에 온다
+# (기존 답글에는 작성 시각이 없으므로 부모 댓글 시각을 사용)
+def _migrated_reply_id(comment_id: ObjectId, index: int) -> ObjectId:
+    timestamp = ObjectId.from_datetime(comment_id.generation_time).binary[:4]
+    return ObjectId(timestamp + hashlib.sha1(comment_id.binary).digest()[:4] + index.to_bytes(4, "big"))
+
+
+# 게시물 문서에 포함되어 있던 기존 댓글을 comments 컬렉션으로 옮긴다 (setup_db에서 실행, 여러 번 실행해도 결과가 같다)
+# 기존 답글은 comments 컬렉션 문서의 replies 배열에만 있었다.
+# 기존 삭제 API는 게시물 문서의 댓글을 지우지 못했으므로(문자열 _id로 $pull) comments 컬렉션에 남아 있는 댓글만 옮긴다.
+async def migrate_embedded_comments(db: AsyncIOMotorDatabase, boards: List[str]):
+    for board in boards:
+        async for post in db[board].find({"comments": {"$exists": True}}, {"comments": 1}):
+            for embedded in post.get("comments") or []:
+                try:
+                    comment_id = ObjectId(embedded.get("_id") or embedded.get("id"))
+                except (InvalidId, TypeError):
+                    continue  # comments 컬렉션에 있을 수 없는 댓글
+                stored = await db[COLLECTION].find_one({"_id": comment_id})
+                if not stored or "reply_count" in stored:  # 삭제된 댓글, 또는 이미 옮긴 댓글
+                    continue
+                replies = stored.get("replies") or []
+                for index, reply in enumerate(replies):
+                    reply_id = _migrated_reply_id(comment_id, index)
+                    await db[COLLECTION].replace_one({"_id": reply_id}, {
+                        "board": board,
+                        "post_id": post["_id"],
+                        "parent_id": comment_id,
+                        "path": f"{comment_id}/",
+                        "depth": 1,
+                        "user": reply.get("user", ""),
+                        "content": reply.get("content", ""),
+                        "is_admin": reply.get("is_admin", False),
+                        "reply_count": 0,
+                        "created_at": reply_id.generation_time,
+                    }, upsert=True)
+                await db[COLLECTION].replace_one({"_id": comment_id}, {
+                    "board": board,
+                    "post_id": post["_id"],
+                    "parent_id": None,
+                    "path": "",
+                    "depth": 0,
+                    "user": stored.get("user", embedded.get("user", "")),
+                    "content": stored.get("content", embedded.get("content", "")),
+                    "is_admin": stored.get("is_admin", embedded.get("is_admin", False)),
+                    "reply_count": len(replies),
+                    "created_at": comment_id.generation_time,
+                })
+            comment_count = await db[COLLECTION].count_documents({"board": board, "post_id": post["_id"]})
+            await db[board].update_one(
+                {"_id": post["_id"]},
+                {"$unset": {"comments": ""}, "$set": {"comment_count": comment_count}}
+            )
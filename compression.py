@@ -0,0 +1,157 @@
+################################################################################
+###################################응답 압축#####################################
+################################################################################
+# Accept-Encoding에 따라 JSON/텍스트 응답을 brotli(설치된 경우) 또는 gzip으로 압축한다.
+# - COMPRESSION_MIN_SIZE 이상인 응답만 압축
+# - GET 200 응답은 압축 결과를 캐시: ETag가 있으면 ETag로, 없으면(목록 페이지) 본문 해시로
+#   같은 버전의 응답은 한 번만 압축한다
+# - 압축된 응답의 ETag에는 -br/-gzip을 붙이고, 들어오는 If-None-Match에서는 떼어
+#   라우터의 ETag 비교(304)가 그대로 동작하도록 한다
+# - 스트리밍 응답(파일 다운로드), 206 부분 응답, 이미 인코딩된 응답은 건드리지 않는다
+
+from typing import List, Optional, Tuple
+import gzip
+import hashlib
+import os
+import re
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 사항
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # 이보다 작은 응답은 압축하지 않음(바이트)
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+CACHE_MAX_BODY = 1024 * 1024  # 이보다 큰 압축 결과는 캐시하지 않음
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/", b"application/javascript", b"application/xml", b"image/svg+xml")
+SKIP_PATHS = ("/files/", "/images/")  # 첨부 파일/이미지 전송
+
+# (경로, 쿼리, ETag, 인코딩) 또는 (본문 해시, 인코딩) -> 압축된 본문
+compressed_cache = TTLCache(maxsize=int(os.getenv("COMPRESSION_CACHE_SIZE", "256")), ttl=float(os.getenv("COMPRESSION_CACHE_TTL", "600")))
+
+_ETAG_SUFFIX = re.compile(r'-(br|gzip)"')
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)  # mtime 고정: 같은 본문은 같은 결과
+
+
+# Accept-Encoding에서 사용할 인코딩 선택 (q=0은 제외, 가중치가 같으면 br 우선)
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for name in (("br", "gzip") if brotli is not None else ("gzip",)):
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def _with_suffix(etag: bytes, encoding: str) -> bytes:
+    return etag[:-1] + f"-{encoding}".encode() + b'"' if etag.endswith(b'"') else etag
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST", "PUT", "DELETE") or scope["path"].startswith(SKIP_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        accept = _header(headers, b"accept-encoding")
+        encoding = choose_encoding(accept.decode("latin-1")) if accept else None
+        # If-None-Match의 -br/-gzip 제거 (304 응답에는 같은 접미사를 다시 붙임)
+        suffix = None
+        if_none_match = _header(headers, b"if-none-match")
+        if if_none_match is not None and b'-' in if_none_match:
+            text = if_none_match.decode("latin-1")
+            found = _ETAG_SUFFIX.search(text)
+            if found:
+                suffix = found.group(1)
+                # scope를 복사하지 않고 그대로 고친다 (라우터가 scope에 남기는 route를 바깥 미들웨어가 읽음)
+                scope["headers"] = [(key, _ETAG_SUFFIX.sub('"', text).encode("latin-1") if key == b"if-none-match" else value) for key, value in headers]
+        if encoding is None and suffix is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            # 첫 번째 본문 메시지에서 압축 여부 결정
+            body = message.get("body", b"")
+            response_headers = list(start.get("headers", []))
+            status = start["status"]
+            if status == 304 and suffix is not None:
+                response_headers = [(key, _with_suffix(value, suffix) if key == b"etag" else value) for key, value in response_headers]
+            if (encoding is None or status in (204, 206, 304) or message.get("more_body", False)
+                    or len(body) < MIN_SIZE
+                    or _header(response_headers, b"content-encoding") is not None
+                    or not (_header(response_headers, b"content-type") or b"").startswith(COMPRESSIBLE_TYPES)):
+                passthrough = True
+                await send(dict(start, headers=response_headers))
+                await send(message)
+                return
+
+            etag = _header(response_headers, b"etag")
+            key = None
+            if scope["method"] == "GET" and status == 200:
+                if etag is not None:  # ETag는 리소스 안에서만 고유하므로 경로와 함께 사용
+                    key = (scope["path"], scope.get("query_string", b""), etag, encoding)
+                else:
+                    key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+            compressed = compressed_cache.get(key) if key is not None else None
+            if compressed is None:
+                compressed = _compress(body, encoding)
+                if key is not None and len(compressed) <= CACHE_MAX_BODY:
+                    compressed_cache.set(key, compressed)
+
+            response_headers = [(name, value) for name, value in response_headers if name not in (b"content-length", b"etag", b"vary")]
+            vary = _header(start.get("headers", []), b"vary")
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            if etag is not None:
+                response_headers.append((b"etag", _with_suffix(etag, encoding)))
+            await send(dict(start, headers=response_headers))
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
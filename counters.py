@@ -0,0 +1,102 @@
+################################################################################
+###############################게시판 카운터 관리################################
+################################################################################
+# counters 컬렉션에 게시판별 문서 하나를 두고 게시물 수(count)와
+# 마지막으로 발급한 글 번호(seq)를 원자적으로 관리한다.
+#   { "_id": "forum", "count": 12, "seq": 15 }
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from typing import List
+
+COLLECTION = "counters"
+
+_seeded = set()  # 이 프로세스에서 카운터 문서가 있음을 확인한 게시판
+
+
+# 카운터 문서가 없으면 기존 게시물 수와 가장 큰 글 번호로 먼저 만든다
+# (없는 상태에서 바로 $inc 하면 count=1, seq=1부터 시작해 글 번호가 겹침)
+async def _ensure_counter(db: AsyncIOMotorDatabase, board: str):
+    if board in _seeded:
+        return
+    if await db[COLLECTION].find_one({"_id": board}, {"_id": 1}) is None:
+        count = await db[board].count_documents({})
+        last = await db[board].find(
+            {"number": {"$exists": True}}, {"number": 1}
+        ).sort("number", -1).limit(1).to_list(length=1)
+        seq = max(last[0]["number"] if last else 0, count)
+        try:
+            await db[COLLECTION].update_one(
+                {"_id": board},
+                {"$setOnInsert": {"count": count, "seq": seq}},  # 동시에 만든 쪽이 있으면 그대로 둔다
+                upsert=True
+            )
+        except DuplicateKeyError:  # 동시 upsert 경합: 다른 요청이 이미 만듦
+            pass
+    _seeded.add(board)
+
+
+# 게시물 생성 시 호출: 게시물 수를 늘리고 새 글 번호를 발급
+async def next_post_number(db: AsyncIOMotorDatabase, board: str) -> int:
+    await _ensure_counter(db, board)
+    counter = await db[COLLECTION].find_one_and_update(
+        {"_id": board},
+        {"$inc": {"seq": 1, "count": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"]
+
+
+# 일괄 가져오기 시 호출: 게시물 수를 amount만큼 늘리고 연속된 글 번호의 첫 번호를 반환
+async def reserve_post_numbers(db: AsyncIOMotorDatabase, board: str, amount: int) -> int:
+    await _ensure_counter(db, board)
+    counter = await db[COLLECTION].find_one_and_update(
+        {"_id": board},
+        {"$inc": {"seq": amount, "count": amount}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - amount + 1
+
+
+# 게시물 삭제 시 호출 (발급된 글 번호는 재사용하지 않음)
+async def decrement_post_count(db: AsyncIOMotorDatabase, board: str, amount: int = 1):
+    await db[COLLECTION].update_one({"_id": board}, {"$inc": {"count": -amount}})
+
+
+# 게시물 수 조회, 카운터가 아직 없으면 직접 센다
+async def get_post_count(db: AsyncIOMotorDatabase, board: str) -> int:
+    counter = await db[COLLECTION].find_one({"_id": board})
+    if counter is None:
+        return await db[board].count_documents({})
+    return max(counter.get("count", 0), 0)
+
+
+# 기존 데이터로부터 카운터를 다시 계산 (setup_db에서 한 번 실행)
+# 글 번호가 없는 게시물에는 작성 순서(_id 오름차순)대로 번호를 매긴다.
+async def rebuild_counters(db: AsyncIOMotorDatabase, boards: List[str]):
+    for board in boards:
+        last = await db[board].find(
+            {"number": {"$exists": True}}, {"number": 1}
+        ).sort("number", -1).limit(1).to_list(length=1)
+        seq = last[0]["number"] if last else 0
+        counter = await db[COLLECTION].find_one({"_id": board})
+        if counter:
+            seq = max(seq, counter.get("seq", 0))  # 이미 발급된 번호는 다시 쓰지 않음
+
+        operations = []
+        async for post in db[board].find({"number": {"$exists": False}}, {"_id": 1}).sort("_id", 1):
+            seq += 1
+            operations.append(UpdateOne({"_id": post["_id"]}, {"$set": {"number": seq}}))
+        if operations:
+            await db[board].bulk_write(operations, ordered=False)
+
+        count = await db[board].count_documents({})
+        await db[COLLECTION].update_one(
+            {"_id": board},
+            {"$set": {"count": count, "seq": seq}},
+            upsert=True
+        )
+        _seeded.add(board)
@@ -0,0 +1,87 @@
+################################################################################
+###############################MongoDB 연결 관리################################
+################################################################################
+# 워커 프로세스마다 하나의 AsyncIOMotorClient(연결 풀)만 사용하기 위한 모듈
+# main.py의 lifespan에서 connect_db()/close_db()를 호출하고
+# 각 라우터는 Depends(get_db)로 데이터베이스 객체를 주입받는다.
+
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from typing import List, Optional
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# 연결 설정 (환경 변수로 조정)
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/kustii")
+DB_NAME = os.getenv("MONGODB_DB_NAME", "board")
+MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "20"))  # 워커당 최대 연결 수
+MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "2"))  # 시작 시 미리 열어둘 연결 수
+MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000"))
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+client: Optional[AsyncIOMotorClient] = None
+
+# 명령 이벤트 리스너 (메트릭, 벤치마크 등), connect_db 전에 등록해야 적용된다
+event_listeners: List[monitoring.CommandListener] = []
+
+
+def add_listener(listener: monitoring.CommandListener):
+    if listener not in event_listeners:
+        event_listeners.append(listener)
+
+
+def create_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        MONGODB_URI,
+        maxPoolSize=MAX_POOL_SIZE,
+        minPoolSize=MIN_POOL_SIZE,
+        maxIdleTimeMS=MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS,
+        tz_aware=True,  # 읽은 datetime도 UTC 시간대를 유지 (응답에 Z/+00:00이 붙도록)
+        event_listeners=list(event_listeners),
+    )
+
+
+# 애플리케이션 시작 시 호출: 클라이언트 생성 후 연결 풀 예열
+async def connect_db():
+    global client
+    if client is None:
+        client = create_client()
+    await warm_pool()
+    logger.info("MongoDB connected (maxPoolSize=%d, minPoolSize=%d)", MAX_POOL_SIZE, MIN_POOL_SIZE)
+
+
+# minPoolSize 만큼 동시에 ping을 보내 첫 요청 전에 핸드셰이크를 끝내둔다
+async def warm_pool():
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(MIN_POOL_SIZE, 1))))
+
+
+# 준비 상태 확인 (readiness probe 용)
+async def check_ready() -> bool:
+    if client is None:
+        return False
+    try:
+        await client.admin.command("ping")
+        return True
+    except Exception:
+        logger.exception("MongoDB readiness check failed")
+        return False
+
+
+# 애플리케이션 종료 시 호출
+def close_db():
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+
+# 라우터 의존성: 공유 연결 풀의 데이터베이스 반환
+def get_db() -> AsyncIOMotorDatabase:
+    if client is None:
+        raise HTTPException(status_code=503, detail="Database not ready")
+    return client[DB_NAME]
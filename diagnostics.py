@@ -0,0 +1,251 @@
+################################################################################
+##################################느린 쿼리 진단##################################
+################################################################################
+# 기준 시간(SLOW_QUERY_MS)을 넘은 MongoDB 명령을 쿼리 형태별로 모은다.
+# - 형태: 컬렉션 + 명령 + 값을 ?로 바꾼 조건 (같은 형태의 쿼리는 값이 달라도 한 항목)
+# - 호출한 라우트 템플릿 (요청마다 contextvar에 ASGI scope를 넣어두고 리스너에서 읽는다,
+#   Motor는 드라이버 스레드로 작업을 넘길 때 context를 복사한다)
+# - 형태마다 처음 느려졌을 때(이후 EXPLAIN_INTERVAL마다) explain("executionStats")를 실행해
+#   COLLSCAN, 메모리 정렬, 반환 대비 검사한 문서 수가 많은 쿼리를 표시
+# GET /diagnostics/slow-queries (superadmin)
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from contextvars import ContextVar
+from pymongo import monitoring
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from auth import get_current_username
+import metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))  # 느린 쿼리 기준(ms)
+EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "600"))  # 같은 형태를 다시 explain하는 간격(초)
+EXAMINED_RATIO = float(os.getenv("SLOW_QUERY_EXAMINED_RATIO", "10"))  # 반환 문서 1개당 검사 문서 수 경고 기준
+MAX_SHAPES = 500  # 보관할 최대 형태 수 (넘으면 가장 오래 안 보인 형태부터 제거)
+
+# 조건을 가진 명령: 명령 -> 명령 문서에서 조건을 꺼내는 함수
+FILTERS = {
+    "find": lambda command: {"filter": command.get("filter", {}), "sort": command.get("sort"), "skip": "skip" in command},
+    "count": lambda command: {"filter": command.get("query", {})},
+    "distinct": lambda command: {"key": command.get("key"), "filter": command.get("query", {})},
+    "aggregate": lambda command: {"pipeline": command.get("pipeline", [])},
+    "findAndModify": lambda command: {"filter": command.get("query", {}), "sort": command.get("sort")},
+    "update": lambda command: {"filter": (command.get("updates") or [{}])[0].get("q", {})},
+    "delete": lambda command: {"filter": (command.get("deletes") or [{}])[0].get("q", {})},
+}
+
+# explain에 넘기지 않는 명령 필드 (세션/복제 관련)
+_SESSION_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "signature", "readConcern", "writeConcern"}
+
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+_pending: Dict[tuple, tuple] = {}  # (request_id, 연결) -> (명령, 컬렉션, 명령 문서, scope)
+slow_queries: Dict[str, dict] = {}  # 형태 키 -> 통계
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_db = None
+
+
+# 값을 ?로 바꾼 쿼리 형태 (연산자와 필드 이름만 남긴다)
+def query_shape(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:  # $in 목록 등은 길이와 관계없이 같은 형태
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def _shape_of(command_name: str, command: dict) -> dict:
+    shape = {}
+    for key, value in FILTERS[command_name](command).items():
+        if value is None or value is False:
+            continue
+        shape[key] = dict(value) if key == "sort" else query_shape(value)  # 정렬 방향은 값이 아니라 형태의 일부
+    return shape
+
+
+# explain 결과에서 실행 단계 이름과 executionStats 찾기 (find/aggregate, 클래식/SBE 모두)
+def _walk(plan: Any, stages: List[str]):
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            _walk(value, stages)
+    elif isinstance(plan, list):
+        for value in plan:
+            _walk(value, stages)
+
+
+def _execution_stats(explain: Any) -> Optional[dict]:
+    if isinstance(explain, dict):
+        if isinstance(explain.get("executionStats"), dict):
+            return explain["executionStats"]
+        for value in explain.values():
+            found = _execution_stats(value)
+            if found is not None:
+                return found
+    elif isinstance(explain, list):
+        for value in explain:
+            found = _execution_stats(value)
+            if found is not None:
+                return found
+    return None
+
+
+def summarize_explain(explain: dict) -> dict:
+    stages: List[str] = []
+    _walk(explain.get("queryPlanner", explain), stages)
+    stats = _execution_stats(explain) or {}
+    examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    flags = []
+    if "COLLSCAN" in stages:
+        flags.append("COLLSCAN")
+    if "SORT" in stages:
+        flags.append("IN_MEMORY_SORT")
+    if examined > EXAMINED_RATIO * max(returned, 1):
+        flags.append("HIGH_EXAMINED_RATIO")
+    return {
+        "stages": list(dict.fromkeys(stages)),
+        "docs_examined": examined,
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "returned": returned,
+        "execution_ms": stats.get("executionTimeMillis"),
+        "flags": flags,
+    }
+
+
+async def _explain(key: str, command: dict):
+    try:
+        explain = await _db.command({"explain": command, "verbosity": "executionStats"})
+        summary = summarize_explain(explain)
+    except Exception as error:  # explain을 지원하지 않는 명령/환경
+        summary = {"error": str(error), "flags": []}
+    with _lock:
+        if key in slow_queries:
+            slow_queries[key]["explain"] = summary
+    if summary["flags"]:
+        logger.warning("slow query %s: %s", key, ", ".join(summary["flags"]))
+
+
+def _record(command_name: str, collection: str, command: dict, scope: Optional[dict], elapsed_ms: float):
+    shape = _shape_of(command_name, command)
+    key = f"{collection}.{command_name} {json.dumps(shape, sort_keys=True, default=str)}"
+    route = metrics.route_template(scope) if scope is not None else "background"
+    now = time.time()
+    explain_due = False
+    with _lock:
+        entry = slow_queries.get(key)
+        if entry is None:
+            if len(slow_queries) >= MAX_SHAPES:
+                del slow_queries[min(slow_queries, key=lambda name: slow_queries[name]["last_seen"])]
+            entry = slow_queries[key] = {
+                "collection": collection, "command": command_name, "shape": shape,
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": {},
+                "first_seen": now, "last_seen": now, "explained_at": 0.0, "explain": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["routes"][route] = entry["routes"].get(route, 0) + 1
+        entry["last_seen"] = now
+        if now - entry["explained_at"] >= EXPLAIN_INTERVAL:
+            entry["explained_at"] = now
+            explain_due = True
+    if explain_due and _loop is not None and _db is not None and command.get("$db") == _db.name:
+        explain_command = {name: value for name, value in command.items() if name not in _SESSION_FIELDS}
+        # 리스너는 드라이버 스레드에서 호출되므로 이벤트 루프에 넘겨 실행
+        _loop.call_soon_threadsafe(lambda: asyncio.ensure_future(_explain(key, explain_command)))
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    def started(self, event):
+        if event.command_name in FILTERS:
+            collection = event.command.get(event.command_name)
+            _pending[(event.request_id, event.connection_id)] = (event.command_name, collection if isinstance(collection, str) else "", event.command, current_scope.get())
+
+    def succeeded(self, event):
+        pending = _pending.pop((event.request_id, event.connection_id), None)
+        if pending is not None and event.duration_micros >= SLOW_QUERY_MS * 1000:
+            command_name, collection, command, scope = pending
+            try:
+                _record(command_name, collection, command, scope, event.duration_micros / 1000)
+            except Exception:
+                logger.exception("failed to record slow query")
+
+    def failed(self, event):
+        _pending.pop((event.request_id, event.connection_id), None)
+
+
+slow_query_listener = SlowQueryListener()
+
+
+# 요청마다 ASGI scope를 contextvar에 넣는다 (라우트는 라우팅 후 scope["route"]에서 읽음)
+class DiagnosticsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+# main.py에서 호출: connect_db 전에 리스너 등록
+def install(app):
+    import database
+    database.add_listener(slow_query_listener)
+    app.add_middleware(DiagnosticsMiddleware)
+
+
+# lifespan에서 connect_db 후 호출: explain을 실행할 이벤트 루프와 데이터베이스
+def start(db):
+    global _loop, _db
+    _loop = asyncio.get_running_loop()
+    _db = db
+
+
+# 느린 쿼리 형태 목록 (정렬: total=누적 시간, max=최대 시간, count=횟수)
+@router.get("/slow-queries")
+async def list_slow_queries(
+        sort: str = "total",
+        limit: int = Query(20, ge=1, le=MAX_SHAPES),
+        username: str = Depends(get_current_username)
+    ):
+    if username != "superadmin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    sort_key = {"total": "total_ms", "max": "max_ms", "count": "count"}.get(sort)
+    if sort_key is None:
+        raise HTTPException(status_code=400, detail="sort must be total, max or count")
+    with _lock:
+        entries = sorted(slow_queries.values(), key=lambda entry: entry[sort_key], reverse=True)[:limit]
+        entries = [dict(entry, routes=dict(entry["routes"]), avg_ms=entry["total_ms"] / entry["count"]) for entry in entries]
+    return {"threshold_ms": SLOW_QUERY_MS, "queries": entries}
+
+
+# 기록 초기화
+@router.delete("/slow-queries")
+async def clear_slow_queries(username: str = Depends(get_current_username)):
+    if username != "superadmin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    with _lock:
+        slow_queries.clear()
+    return {"message": "Slow query log cleared"}
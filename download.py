@@ -0,0 +1,200 @@
+################################################################################
+###############################첨부 파일 다운로드################################
+################################################################################
+# 게시물에 저장된 경로(files/..., images/...)를 그대로 URL로 사용해 파일을 제공한다.
+#   GET /files/ab/cd/<sha256>?name=원본이름.pdf
+# - Range 요청 지원 (이어받기, 동영상 탐색)
+# - 서버가 ASGI zerocopysend 확장을 지원하면 sendfile로 전송, 아니면 청크 스트리밍
+# - ETag/Last-Modified/Cache-Control 설정, 조건부 요청에는 304 응답
+# 내용 기반 저장소(storage.py)의 파일은 경로가 바뀌지 않으므로 immutable로 캐시한다.
+# Content-Type은 저장된 파일 기준(저장소에 기록한 형식 또는 변환본 확장자)으로 정하고 ?name=은 파일 이름에만 쓴다.
+# 이미지/PDF/동영상 같은 안전한 형식만 inline, 나머지는 attachment로 내려보내고 항상 nosniff를 붙인다.
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import aiofiles
+import mimetypes
+import os
+import re
+from cache import TTLCache, etag_matches
+from database import get_db
+from storage import BlobStore, file_store, image_store
+
+router = APIRouter()
+
+CHUNK_SIZE = 256 * 1024
+BLOB_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})$")  # storage.BlobStore 경로 형식
+DERIVED_PATTERN = re.compile(r"^(?:thumbs|variants)/[0-9a-f]{2}/([0-9a-f]{64}_\w+\.\w+)$")  # image_pipeline 썸네일/변환본 경로 형식
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+NOSNIFF = {"X-Content-Type-Options": "nosniff"}  # 브라우저가 Content-Type을 추측하지 않도록
+# 브라우저에서 바로 열어도 스크립트가 실행되지 않는 형식 (SVG, HTML 등은 다운로드로)
+INLINE_TYPES = {
+    "image/png", "image/jpeg", "image/gif", "image/webp", "image/avif",
+    "application/pdf", "video/mp4", "video/webm", "audio/mpeg", "audio/ogg",
+}
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+# blob_id -> 저장소에 기록된 Content-Type (내용이 바뀌지 않으므로 오래 캐시)
+media_types = TTLCache(maxsize=4096, ttl=3600)
+
+
+# 파일의 일부(또는 전체)를 전송하는 응답
+class FileRangeResponse(Response):
+    def __init__(self, path: str, start: int, length: int, status_code: int, headers: dict, send_body: bool = True):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.status_code = status_code
+        self.send_body = send_body
+        self.background = None
+        self.raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            # 커널에서 바로 소켓으로 복사 (sendfile)
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                })
+            return
+
+        async with aiofiles.open(self.path, "rb") as file:
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:  # 전송 도중 파일이 줄어든 경우
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+
+
+# 요청 경로를 실제 파일 경로로 변환 (루트 밖으로 나가는 경로, 업로드 중인 임시 파일은 거부)
+def resolve_path(root: str, path: str) -> str:
+    root_path = os.path.realpath(root)
+    full_path = os.path.realpath(os.path.join(root_path, path))
+    if not full_path.startswith(root_path + os.sep) or path.startswith("tmp/") or path.endswith((".part", ".deleting")):
+        raise HTTPException(status_code=404, detail="File not found", headers=NOSNIFF)
+    if not os.path.isfile(full_path):
+        raise HTTPException(status_code=404, detail="File not found", headers=NOSNIFF)
+    return full_path
+
+
+# Range 헤더 해석, 단일 범위만 지원 (여러 범위는 전체 응답)
+# 반환값: (시작, 끝) 또는 None(전체), 만족할 수 없으면 416
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:  # bytes=-500 : 마지막 500바이트
+            suffix = int(end_text)
+            if suffix == 0:
+                raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}", **NOSNIFF})
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}", **NOSNIFF})
+    return start, min(end, size - 1)
+
+
+def not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+# 저장된 파일의 Content-Type: 원본 blob은 저장소 기록, 썸네일/변환본은 경로의 확장자
+async def stored_media_type(db: AsyncIOMotorDatabase, store: BlobStore, path: str) -> str:
+    blob = BLOB_PATTERN.match(path)
+    if not blob:
+        return mimetypes.guess_type(path)[0] or "application/octet-stream"
+    blob_id = blob.group(1)
+    media_type = media_types.get(blob_id)
+    if media_type is None:
+        record = await db[store.collection].find_one({"_id": blob_id}, {"content_type": 1})
+        media_type = (record or {}).get("content_type") or "application/octet-stream"  # 형식이 기록되기 전 파일
+        media_types.set(blob_id, media_type)
+    return media_type
+
+
+async def file_response(request: Request, db: AsyncIOMotorDatabase, store: BlobStore, path: str, name: Optional[str]) -> Response:
+    full_path = resolve_path(store.root, path)
+    stat = os.stat(full_path)
+    blob = BLOB_PATTERN.match(path) or DERIVED_PATTERN.match(path)
+    if blob:  # 내용 기반 경로: 체크섬이 곧 ETag
+        etag = f'"{blob.group(1)}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        cache_control = DEFAULT_CACHE_CONTROL
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        **NOSNIFF,
+    }
+    if not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    media_type = await stored_media_type(db, store, path)
+    headers["Content-Type"] = media_type
+    disposition = "inline" if media_type in INLINE_TYPES else "attachment"
+    headers["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{quote(name)}" if name else disposition
+
+    # If-Range가 현재 ETag와 다르면 Range를 무시하고 전체를 보낸다
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == etag:
+        byte_range = parse_range(request.headers.get("range"), stat.st_size)
+
+    send_body = request.method != "HEAD"
+    if byte_range is None:
+        headers["Content-Length"] = str(stat.st_size)
+        return FileRangeResponse(full_path, 0, stat.st_size, 200, headers, send_body)
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    return FileRangeResponse(full_path, start, end - start + 1, 206, headers, send_body)
+
+
+# 게시판/미디어 첨부 파일
+@router.api_route("/files/{path:path}", methods=["GET", "HEAD"])
+async def download_file(path: str, request: Request, name: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
+    return await file_response(request, db, file_store, path, name)
+
+# 소개 페이지 이미지
+@router.api_route("/images/{path:path}", methods=["GET", "HEAD"])
+async def download_image(path: str, request: Request, name: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
+    return await file_response(request, db, image_store, path, name)
@@ -0,0 +1,90 @@
+################################################################################
+###################################최신 게시물 피드###############################
+################################################################################
+# 메인 페이지용: 모든 게시판(주요사업, 공지사항)의 최신 게시물을 한 번에 제공한다.
+# 게시판별 최신 limit개를 동시에 조회한 뒤 _id(작성 시각) 기준 k-way 병합하고,
+# 결과는 feed_cache에 저장해 게시판 글 작성/수정/삭제 전까지 재사용한다 (다른 워커의 수정은 cache.SharedCache로 확인).
+
+from fastapi import APIRouter, Depends, Request, Response
+from pydantic import BaseModel, Field
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import List, Optional
+from itertools import islice
+import asyncio
+import heapq
+from database import get_db
+from serialization import TrustedRoute
+from pagination import SUMMARY_PROJECTION
+from cache import feed_cache, make_etag, etag_matches
+from main_business import types as main_business_types
+from notice import types as notice_types
+
+router = APIRouter(route_class=TrustedRoute)  # DB 문서를 다시 검증하지 않고 바로 직렬화
+
+BOARDS = main_business_types + notice_types
+MAX_LIMIT = 50
+DEFAULT_LIMIT = 10
+
+class FeedPost(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    board: str  # 게시판 종류
+    number: Optional[int] = None  # 글 번호
+    title: str  # 제목
+    excerpt: str = ""  # 본문 미리보기
+    views: int = 0  # 조회수
+    file_count: int = 0  # 첨부 파일 수
+    comment_count: int = 0  # 댓글 수
+    has_files: bool = False  # 파일 존재 여부
+    class Config:
+        allow_population_by_field_name = True
+
+class FeedResponse(BaseModel):
+    posts: List[FeedPost] = Field(..., description="최신 게시물 목록")
+
+# 게시판별 최신 게시물 조회 (최신순)
+async def latest_posts(db: AsyncIOMotorDatabase, board: str, limit: int) -> List[dict]:
+    posts = await db[board].find({}, SUMMARY_PROJECTION).sort("_id", -1).limit(limit).to_list(length=limit)
+    for post in posts:
+        post["board"] = board
+    return posts
+
+# 모든 게시판의 최신 게시물 병합
+async def build_feed(db: AsyncIOMotorDatabase, limit: int) -> List[dict]:
+    per_board = await asyncio.gather(*[latest_posts(db, board, limit) for board in BOARDS])
+    merged = heapq.merge(*per_board, key=lambda post: post["_id"], reverse=True)  # 각 목록이 이미 최신순
+    feed = []
+    for post in islice(merged, limit):
+        post["_id"] = str(post["_id"])
+        post["has_files"] = post.get("file_count", 0) > 0
+        feed.append(post)
+    return feed
+
+# 캐시된 (피드, ETag) 반환, 캐시에 없으면 게시판들을 조회해 병합 후 저장
+async def load_feed(db: AsyncIOMotorDatabase, limit: int):
+    await feed_cache.revalidate(db)  # 다른 워커에서 글이 바뀌었으면 비움
+    cached = feed_cache.get(limit)
+    if cached is None:
+        feed = {"posts": await build_feed(db, limit)}
+        cached = (feed, make_etag(feed))
+        feed_cache.set(limit, cached)
+    return cached
+
+# 워커 시작 시 기본 크기 피드 캐시 채우기
+async def warm_cache(db: AsyncIOMotorDatabase):
+    await load_feed(db, DEFAULT_LIMIT)
+
+# 최신 게시물 피드 조회
+@router.get("", response_model=FeedResponse)
+async def get_feed(
+        request: Request,
+        response: Response,
+        limit: int = DEFAULT_LIMIT,
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    limit = min(max(limit, 1), MAX_LIMIT)
+    feed, etag = await load_feed(db, limit)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})  # 변경 없음
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"  # 매번 ETag로 재검증
+    return feed
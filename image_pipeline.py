@@ -0,0 +1,174 @@
+################################################################################
+#################################이미지 처리#####################################
+################################################################################
+# 원격 이미지 다운로드(비동기, 시간/크기 제한)와 썸네일/반응형 이미지 생성.
+# 이미지 디코딩/리사이즈는 CPU 작업이므로 이벤트 루프가 아닌 프로세스 풀에서 실행한다.
+
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from PIL import Image, ImageOps, features
+from typing import Dict, List, Optional
+import asyncio
+import glob
+import hashlib
+import httpx
+import multiprocessing
+import os
+
+FETCH_TIMEOUT = httpx.Timeout(float(os.getenv("IMAGE_FETCH_TIMEOUT", "10")), connect=5.0)
+FETCH_DEADLINE = float(os.getenv("IMAGE_FETCH_DEADLINE", "30"))  # 다운로드 전체 제한 시간(초), 조금씩 보내는 서버 대비
+MAX_IMAGE_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))  # 원격 이미지 최대 10MB
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# 썸네일 크기 (이름: (너비, 높이)), 큰 것부터 만들고 작은 것은 앞 결과에서 줄인다
+THUMBNAIL_SIZES = {
+    "detail": (1280, 720),
+    "card": (640, 360),
+    "list": (320, 180),
+}
+THUMBNAIL_DIR = "files/thumbs"
+
+# 소개 페이지 이미지 변환본: 너비별로 WebP(지원 시 AVIF)와 기본 형식(JPEG/PNG) 생성, 메타데이터 제거
+VARIANT_WIDTHS = [1600, 960, 480]
+VARIANT_DIR = "images/variants"
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=FETCH_TIMEOUT, follow_redirects=True)
+    return _http_client
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+# 애플리케이션 종료 시 호출
+async def close_image_pipeline():
+    global _http_client, _pool
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# URL의 이미지를 내려받는다. 이미지가 아니거나, 최대 크기/전체 제한 시간을 넘으면 중단
+async def fetch_image(url: str) -> bytes:
+    try:
+        return await asyncio.wait_for(_download_image(url), FETCH_DEADLINE)
+    except asyncio.TimeoutError as e:
+        raise ImageFetchError(f"Image fetch timed out: {url}") from e
+    except httpx.HTTPError as e:
+        raise ImageFetchError(f"Image fetch failed: {url} ({e})") from e
+
+
+async def _download_image(url: str) -> bytes:
+    async with get_http_client().stream("GET", url) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        if not content_type.startswith("image/"):
+            raise ImageFetchError(f"Not an image ({content_type or 'no content type'}): {url}")
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+            raise ImageFetchError(f"Image too large: {url}")
+        data = bytearray()
+        async for chunk in response.aiter_bytes():
+            data.extend(chunk)
+            if len(data) > MAX_IMAGE_BYTES:
+                raise ImageFetchError(f"Image too large: {url}")
+        return bytes(data)
+
+
+# 프로세스 풀에서 실행: 한 번 디코딩해서 모든 크기의 썸네일을 JPEG로 저장
+def render_thumbnails(data: bytes, base_path: str) -> Dict[str, str]:
+    os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    paths = {}
+    with Image.open(BytesIO(data)) as source:
+        largest = max(THUMBNAIL_SIZES.values())
+        source.draft("RGB", largest)  # JPEG는 디코딩 단계에서 축소
+        image = ImageOps.exif_transpose(source).convert("RGB")
+        for name, size in THUMBNAIL_SIZES.items():
+            image = ImageOps.fit(image, size, Image.LANCZOS)
+            path = f"{base_path}_{name}.jpg"
+            temp_path = f"{path}.{os.getpid()}.part"  # 완성된 파일만 보이도록 임시 파일에 쓴 뒤 교체
+            image.save(temp_path, "JPEG", quality=85, optimize=True, progressive=True)
+            os.replace(temp_path, path)
+            paths[name] = path
+    return paths
+
+
+# URL 이미지로 썸네일 생성, 이름별 저장 경로를 반환
+# 저장 경로는 원본 내용의 SHA-256으로 정하므로 같은 이미지는 다시 만들지 않는다
+async def thumbnails_from_url(url: str) -> Dict[str, str]:
+    data = await fetch_image(url)
+    digest = hashlib.sha256(data).hexdigest()
+    base_path = f"{THUMBNAIL_DIR}/{digest[:2]}/{digest}"
+    paths = {name: f"{base_path}_{name}.jpg" for name in THUMBNAIL_SIZES}
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_pool(), render_thumbnails, data, base_path)
+    except (OSError, Image.DecompressionBombError) as e:  # 이미지가 아니거나 손상된 경우
+        raise InvalidImageError(f"Invalid image: {url} ({e})") from e
+
+
+# 프로세스 풀에서 실행: 원본보다 작은 너비별로 변환본을 만들어 [{width, format, path}] 반환
+# 변환본은 원본의 EXIF 등 메타데이터를 복사하지 않는다
+def render_variants(source_path: str, base_path: str) -> List[dict]:
+    os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    variants = []
+    with Image.open(source_path) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        formats = [("webp", "WEBP", {"quality": 80, "method": 6})]
+        if features.check("avif"):
+            formats.insert(0, ("avif", "AVIF", {"quality": 60}))
+        formats.append(("png", "PNG", {"optimize": True}) if has_alpha else ("jpg", "JPEG", {"quality": 85, "optimize": True, "progressive": True}))
+
+        widths = [width for width in VARIANT_WIDTHS if width < image.width] or [image.width]
+        for width in widths:  # 큰 것부터 줄여 나간다
+            height = max(round(image.height * width / image.width), 1)
+            image = image.resize((width, height), Image.LANCZOS)
+            for extension, image_format, options in formats:
+                path = f"{base_path}_{width}.{extension}"
+                temp_path = f"{path}.{os.getpid()}.part"
+                image.save(temp_path, image_format, **options)
+                os.replace(temp_path, path)
+                variants.append({"width": width, "format": extension, "path": path})
+    return variants
+
+
+# 저장소에 올라간 이미지(blob)의 변환본 생성
+async def image_variants(source_path: str, blob_id: str) -> List[dict]:
+    base_path = f"{VARIANT_DIR}/{blob_id[:2]}/{blob_id}"
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_pool(), render_variants, source_path, base_path)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(f"Invalid image ({e})") from e
+
+
+# 원본 이미지가 삭제될 때 변환본도 삭제
+def remove_variants(blob_id: str):
+    for path in glob.glob(f"{VARIANT_DIR}/{blob_id[:2]}/{blob_id}_*"):
+        os.remove(path)
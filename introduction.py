@@ -2,32 +2,106 @@
 ###################################소개 페이지###################################
 ################################API TEST COMPLETE###############################
 ################################################################################
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from bson import ObjectId
-import aiofiles
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 import os  # os 모듈을 가져와서 환경 변수를 읽기 위함
 from auth import get_user_role, get_current_username
+from database import get_db
+from storage import image_store
+from image_pipeline import image_variants, remove_variants, InvalidImageError
+from cache import SharedCache, make_etag, etag_matches
 
 # FastAPI의 APIRouter 객체 생성, 이를 통해 라우트를 그룹화
 router = APIRouter()
 
-# MongoDB 클라이언트를 설정하고 데이터베이스 연결
-client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/kustii"))
-db = client["board"]
+# 소개 페이지 캐시: type -> (문서, ETag)
+# 수정은 update_post에서만 일어나므로 수정 시 bump로 모든 워커의 캐시를 비운다 (다른 워커는 CACHE_REVALIDATE_INTERVAL 안에 반영)
+page_cache = SharedCache("introduction", maxsize=16, ttl=float(os.getenv("INTRODUCTION_CACHE_TTL", "600")))
 
 # Pydantic 모델 정의, 요청 데이터 검증을 위함
+class ImageVariant(BaseModel):
+    width: int  # 너비(px)
+    format: str  # avif, webp, jpg, png
+    path: str  # 파일 경로
+
+# <picture>의 <source> 하나: 형식별 srcset ("경로 480w, 경로 960w")
+class ImageSource(BaseModel):
+    type: str  # image/avif, image/webp, image/jpeg, image/png
+    srcset: str
+
 class IntroductionPost(BaseModel):
     title: str  # 제목
     content: str  # 최대 3000자 내용
     image: str = None # 이미지 파일 경로
+    image_variants: Optional[List[ImageVariant]] = None  # 크기/형식별 변환본
+    image_sources: Optional[List[ImageSource]] = None  # 선호 형식 순서의 <picture> source 목록 (브라우저가 형식/너비 선택)
+
+# 형식 우선순위 (Accept 헤더로 지원 여부 확인, 기본 형식은 항상 지원)
+VARIANT_FORMAT_TYPES = [("avif", "image/avif"), ("webp", "image/webp")]
+BASE_FORMAT_TYPES = [("jpg", "image/jpeg"), ("png", "image/png")]
+
+# 변환본 목록을 <picture>용 source 목록으로 (선호 형식 먼저, 기본 형식은 마지막)
+# fetch()로 부르는 JSON API는 Accept가 */*라 형식을 고를 수 없으므로 선택은 브라우저에 맡긴다
+def image_sources(variants: Optional[List[dict]]) -> Optional[List[dict]]:
+    if not variants:
+        return None
+    sources = []
+    for extension, media_type in VARIANT_FORMAT_TYPES + BASE_FORMAT_TYPES:
+        candidates = sorted((variant for variant in variants if variant["format"] == extension), key=lambda variant: variant["width"])
+        if candidates:
+            sources.append({"type": media_type, "srcset": ", ".join(f"{variant['path']} {variant['width']}w" for variant in candidates)})
+    return sources
+
+# 요청한 너비와 Accept 헤더에 맞는 변환본 경로 선택
+# 받아들이는 형식 중 변환본이 있는 첫 형식, 없으면 기본 형식(jpg/png)
+# width가 없으면 가장 큰 변환본, 있으면 그 이상인 것 중 가장 작은 변환본
+def select_image(post: dict, width: Optional[int], accept: str) -> Optional[str]:
+    variants = post.get("image_variants")
+    if not variants:
+        return post.get("image")
+    candidates = []
+    for extension, media_type in VARIANT_FORMAT_TYPES:
+        if media_type in accept:
+            candidates = [variant for variant in variants if variant["format"] == extension]
+            if candidates:
+                break
+    if not candidates:
+        candidates = [variant for variant in variants if variant["format"] in ("jpg", "png")]
+    candidates.sort(key=lambda variant: variant["width"])
+    if width:
+        for variant in candidates:
+            if variant["width"] >= width:
+                return variant["path"]
+    return candidates[-1]["path"] if candidates else post.get("image")
 
 # type : 게시글 종류
 #   hello : 인사말
 #   intro : KUSTII소개
 #   organization : 조직도
+types = ["hello", "intro", "organization"]
+
+# 캐시된 (문서, ETag) 반환, 캐시에 없으면 DB에서 조회 후 저장 (문서가 없으면 None)
+async def load_page(db: AsyncIOMotorDatabase, type: str):
+    await page_cache.revalidate(db)  # 다른 워커에서 수정되었으면 비움
+    cached = page_cache.get(type)
+    if cached is None:
+        post = await db[type].find_one()  # 첫 번째 게시물 조회
+        if not post:
+            return None
+        post["_id"] = str(post["_id"])  # ObjectId를 문자열로 변환
+        post["image_sources"] = image_sources(post.get("image_variants"))
+        cached = (post, make_etag(post))
+        page_cache.set(type, cached)
+    return cached
+
+# 워커 시작 시 소개 페이지 캐시 채우기
+async def warm_cache(db: AsyncIOMotorDatabase):
+    for type in types:
+        await load_page(db, type)
+
 
 @router.post("/{type}/update", response_model=IntroductionPost, dependencies=[Depends(get_current_username)])
 async def update_post(
@@ -35,36 +109,64 @@ async def update_post(
         title: str = Form(...), 
         content: str = Form(...), 
         image: UploadFile = File(None), 
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
         ):
     if username != "superadmin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     post_dict = {"title": title, "content": content}    
     if image:  # 이미지 파일이 있는 경우
-        file_location = f"images/{image.filename}"  # 이미지 파일 경로 설정
-        async with aiofiles.open(file_location, 'wb') as out_file:  # 비동기 파일 쓰기
-            content = await image.read()  # 이미지 파일 읽기
-            await out_file.write(content)  # 이미지 파일 쓰기
-        post_dict['image'] = file_location  # 딕셔너리에 이미지 파일 경로 추가
+        stored_image = (await image_store.put_uploads(db, [image]))[0]  # 내용 기반 저장소에 저장
+        post_dict['image'] = stored_image['path']  # 딕셔너리에 이미지 파일 경로 추가
+        post_dict['image_blob'] = stored_image['blob_id']
+        try:  # 너비별/형식별 변환본 생성 (프로세스 풀에서 실행)
+            post_dict['image_variants'] = await image_variants(stored_image['path'], stored_image['blob_id'])
+        except InvalidImageError:
+            await image_store.release(db, stored_image['blob_id'])
+            raise HTTPException(status_code=400, detail="Invalid image")
     
     # 문서 업데이트 (upsert를 통해 문서가 없으면 삽입)
-    result = await db[type].update_one(
+    old_post = await db[type].find_one_and_update(
         {},  # 조건을 비워두어 컬렉션의 첫 번째 문서를 찾음
         {"$set": post_dict},  # 문서를 업데이트
         upsert=True  # 문서가 없으면 새 문서 삽입
     )
+    if image and old_post and old_post.get("image_blob"):
+        if await image_store.release(db, old_post["image_blob"]):  # 이전 이미지 참조 해제
+            remove_variants(old_post["image_blob"])
+    await page_cache.bump(db)  # 캐시 무효화 (모든 워커)
+
     # 업데이트된 문서 또는 삽입된 문서를 반환
     updated_post = await db[type].find_one({})
     updated_post["_id"] = str(updated_post["_id"])  # ObjectId를 문자열로 변환    
+    updated_post["image_sources"] = image_sources(updated_post.get("image_variants"))
     return updated_post  # 생성된 게시물 반환
 
 # 게시물 조회 엔드포인트, GET 요청을 처리
 @router.get("/{type}", response_model=IntroductionPost)
-async def get_post(type: str):
-    post = await db[type].find_one()  # 첫 번째 게시물 조회
-    if post:
-        post["_id"] = str(post["_id"])  # ObjectId를 문자열로 변환
-        return post
-    else:
-        raise HTTPException(status_code=404, detail="Post not found")
\ No newline at end of file
+async def get_post(
+        type: str,
+        request: Request,
+        response: Response,
+        width: Optional[int] = None,
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if type not in types:  # 없는 종류는 캐시/DB를 거치지 않고 바로 404
+        raise HTTPException(status_code=404, detail="Post not found")
+    cached = await load_page(db, type)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    post, etag = cached
+    # 화면 너비와 브라우저 지원 형식에 맞는 이미지 경로로 교체
+    image = select_image(post, width, request.headers.get("accept", ""))
+    if image != post.get("image"):
+        post = {**post, "image": image}
+        etag = make_etag([etag, image])
+    response.headers["Vary"] = "Accept"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})  # 변경 없음
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"  # 매번 ETag로 재검증
+    return post
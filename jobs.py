@@ -0,0 +1,162 @@
+################################################################################
+##################################백그라운드 작업################################
+################################################################################
+# MongoDB jobs 컬렉션을 작업 큐로 사용하고, 각 워커 프로세스 안의 asyncio 작업자가
+# 작업을 가져가 실행한다. 실패하면 지수 백오프로 재시도하고, 처리 중 프로세스가 죽으면
+# 임대 시간(locked_until)이 지난 뒤 다른 작업자가 다시 가져간다.
+#   { "kind": "media_thumbnail", "payload": {...}, "status": "pending" | "running" | "done" | "failed",
+#     "attempts": 1, "run_at": datetime, "locked_until": datetime, "last_error": "..." }
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "jobs"
+WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # 프로세스당 작업자 수
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2"))  # 초, 재시도마다 두 배
+BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))  # 처리 중 작업 임대 시간
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+
+Handler = Callable[[AsyncIOMotorDatabase, dict], Awaitable[None]]
+FailureHandler = Callable[[AsyncIOMotorDatabase, dict, str], Awaitable[None]]
+
+_handlers: Dict[str, Handler] = {}
+_failure_handlers: Dict[str, FailureHandler] = {}
+
+
+# 작업 종류별 처리 함수 등록 (on_failure는 재시도를 모두 실패했을 때 호출)
+def register(kind: str, handler: Handler, on_failure: Optional[FailureHandler] = None):
+    _handlers[kind] = handler
+    if on_failure is not None:
+        _failure_handlers[kind] = on_failure
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def backoff_delay(attempts: int) -> float:
+    return min(BACKOFF_BASE * (2 ** (attempts - 1)), BACKOFF_MAX)
+
+
+class JobQueue:
+    def __init__(self, workers: int = WORKERS):
+        self.workers = workers
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    # 작업 등록, 같은 프로세스의 작업자는 바로 깨운다
+    async def enqueue(self, db: AsyncIOMotorDatabase, kind: str, payload: dict) -> ObjectId:
+        now = _now()
+        result = await db[COLLECTION].insert_one({
+            "kind": kind,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "run_at": now,
+            "created_at": now,
+        })
+        self._wakeup.set()
+        return result.inserted_id
+
+    # 여러 작업을 한 번에 등록 (일괄 가져오기 등)
+    async def enqueue_many(self, db: AsyncIOMotorDatabase, kind: str, payloads: List[dict]):
+        if not payloads:
+            return
+        now = _now()
+        await db[COLLECTION].insert_many([
+            {"kind": kind, "payload": payload, "status": "pending", "attempts": 0, "run_at": now, "created_at": now}
+            for payload in payloads
+        ], ordered=False)
+        self._wakeup.set()
+
+    # 실행할 작업 하나를 원자적으로 가져온다 (임대 시간이 지난 처리 중 작업 포함)
+    async def _claim(self) -> Optional[dict]:
+        now = _now()
+        return await self._db[COLLECTION].find_one_and_update(
+            {"$or": [
+                {"status": "pending", "run_at": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": "running", "locked_until": now + timedelta(seconds=LEASE_SECONDS)}, "$inc": {"attempts": 1}},
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run(self, job: dict):
+        jobs = self._db[COLLECTION]
+        handler = _handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job['kind']}")
+            await handler(self._db, job["payload"])
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job["attempts"] >= MAX_ATTEMPTS or handler is None:
+                logger.error("job %s (%s) failed permanently: %s", job["_id"], job["kind"], error)
+                await jobs.update_one({"_id": job["_id"]}, {"$set": {"status": "failed", "last_error": error, "finished_at": _now()}})
+                on_failure = _failure_handlers.get(job["kind"])
+                if on_failure is not None:
+                    await on_failure(self._db, job["payload"], error)
+            else:
+                delay = backoff_delay(job["attempts"])
+                logger.warning("job %s (%s) failed, retrying in %.0fs: %s", job["_id"], job["kind"], delay, error)
+                await jobs.update_one(
+                    {"_id": job["_id"]},
+                    {"$set": {"status": "pending", "last_error": error, "run_at": _now() + timedelta(seconds=delay)}}
+                )
+        else:
+            await jobs.update_one({"_id": job["_id"]}, {"$set": {"status": "done", "finished_at": _now()}})
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("job claim failed")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run(job)
+            except Exception:
+                # 상태 기록 실패: 임대 시간이 지나면 다시 가져가게 된다
+                logger.exception("job %s bookkeeping failed", job["_id"])
+
+    # 애플리케이션 시작 시 작업자 시작
+    def start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._stopping = False
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    # 애플리케이션 종료 시 진행 중인 작업이 끝나기를 잠시 기다린 뒤 정리
+    async def stop(self, timeout: float = 10):
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()  # 중단된 작업은 임대 시간이 지나면 다시 실행된다
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+
+job_queue = JobQueue()
@@ -1,23 +1,91 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
+import logging
 import os
-import uvicorn
+import serve
+from database import connect_db, close_db, check_ready, get_db
+from view_counter import view_buffer
+from image_pipeline import close_image_pipeline
+from jobs import job_queue
+import introduction
+import feed
+import admission
+import compression
+import uploads
+import metrics
+import diagnostics
+from setup_db import log_index_report
 from auth import router as login_router 
 from introduction import router as introduction_router
 from main_business import router as main_business_router
 from notice import router as notice_router
 from media_center import router as media_center_router
+from download import router as download_router
+from search import router as search_router
+from feed import router as feed_router
+from diagnostics import router as diagnostics_router
 
-app = FastAPI()
+# 애플리케이션 수명 주기: 시작 시 연결 풀 예열, 종료 시 정리
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_db()
+    if os.getenv("INDEX_CHECK_ON_STARTUP", "1") == "1":
+        try:  # 인덱스 상태 확인만 하고 만들지는 않음 (생성은 setup_db.py)
+            await log_index_report(get_db())
+        except Exception:
+            logging.getLogger(__name__).exception("index check failed")
+    diagnostics.start(get_db())  # 느린 쿼리 explain 실행용
+    if os.getenv("WARM_CACHES", "1") == "1":
+        try:  # 요청을 받기 전에 자주 읽는 페이지 캐시 채우기
+            await introduction.warm_cache(get_db())
+            await feed.warm_cache(get_db())
+        except Exception:
+            logging.getLogger(__name__).exception("cache warm-up failed")
+    view_buffer.start(get_db())  # 조회수 버퍼 주기적 반영 시작
+    job_queue.start(get_db())  # 백그라운드 작업자 시작
+    yield
+    await job_queue.stop()
+    await view_buffer.stop()  # 남은 조회수 반영
+    await close_image_pipeline()
+    close_db()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(compression.CompressionMiddleware)  # gzip/brotli 응답 압축
+app.add_middleware(admission.AdmissionMiddleware)  # 요청 종류별 동시 처리 수 제한
+app.add_middleware(uploads.RequestSizeLimitMiddleware)  # 업로드 요청 크기 제한 (폼 파싱 전, 대기열에 들어가기 전)
+diagnostics.install(app)  # 느린 쿼리 수집 (호출한 라우트 기록)
+metrics.install(app)  # 요청/DB 명령 지표 수집 (가장 바깥 미들웨어, 거절된 요청도 집계)
 
 app.include_router(login_router, tags=["login"])
 app.include_router(introduction_router, prefix="/introduction", tags=["introduction"])
 app.include_router(main_business_router, prefix="/mainbusiness", tags=["main_buiness"])
 app.include_router(notice_router, prefix="/notice", tags=["notice"])
 app.include_router(media_center_router, prefix="/mediacenter", tags=["media_center"])
+app.include_router(download_router, tags=["download"])
+app.include_router(search_router, prefix="/search", tags=["search"])
+app.include_router(feed_router, prefix="/feed", tags=["feed"])
+app.include_router(diagnostics_router, prefix="/diagnostics", tags=["diagnostics"])
+
+# 준비 상태 확인 엔드포인트
+@app.get("/ready", tags=["health"])
+async def ready():
+    if not await check_ready():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database not ready")
+    return {"status": "ready"}
+
+# 요청 종류별 처리 중/대기 중 요청 수
+@app.get("/admission", tags=["health"])
+async def admission_stats():
+    return admission.stats()
+
+# Prometheus 형식 지표
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    serve.main()  # 다중 워커 서버 (설정은 serve.py 참고)
\ No newline at end of file
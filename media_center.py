@@ -7,37 +7,50 @@
 #################################Comment test #################################
 ################################게시글조회 test O###############################
 ###############################################################################
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from bson import ObjectId
-import aiofiles
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from auth import get_user_role, get_current_username
-import requests
-from PIL import Image
-from io import BytesIO
+from database import get_db
+from storage import Attachment, file_store, blob_ids
+from image_pipeline import thumbnails_from_url
+from jobs import job_queue, register
+from admission import limiters
+import bulk
+from bulk import BulkResult, BulkIds, BulkUpdate
 
 # FastAPI의 APIRouter 객체 생성, 이를 통해 라우트를 그룹화
 router = APIRouter()
 
-# MongoDB 클라이언트를 설정하고 데이터베이스 연결
-client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/kustii"))
-db = client["board"]
-
 # Pydantic 모델 정의, 요청 데이터 검증을 위함
 class MediaPost(BaseModel):
     title: str  # 제목
     url: str  # URL 주소
     thumbnail: Optional[str] = None  # 썸네일 이미지 경로
-    files: Optional[List[str]] = None  # 파일 경로 리스트
+    thumbnails: Optional[Dict[str, str]] = None  # 크기별 썸네일 경로 (list, card, detail)
+    thumbnail_status: Optional[str] = None  # 썸네일 생성 상태 (pending, ready, failed)
+    files: Optional[List[Union[Attachment, str]]] = None  # 첨부 파일 목록 (기존 게시물은 경로 문자열)
+
+# 백그라운드 작업: URL에서 이미지를 다운로드하여 크기별 썸네일을 만드는 함수
+# (작업 등록 이후 게시물 URL이 바뀌었으면 결과를 반영하지 않음)
+async def generate_thumbnails(db: AsyncIOMotorDatabase, payload: dict):
+    async with limiters["thumbnail"].slot():  # 동시 썸네일 생성 수 제한 (대기열이 가득 차면 작업 재시도)
+        thumbnails = await thumbnails_from_url(payload["url"])
+    await db[payload["type"]].update_one(
+        {"_id": ObjectId(payload["post_id"]), "url": payload["url"]},
+        {"$set": {"thumbnails": thumbnails, "thumbnail": thumbnails["card"], "thumbnail_status": "ready"}}
+    )
+
+# 재시도를 모두 실패한 경우
+async def thumbnail_failed(db: AsyncIOMotorDatabase, payload: dict, error: str):
+    await db[payload["type"]].update_one(
+        {"_id": ObjectId(payload["post_id"]), "url": payload["url"]},
+        {"$set": {"thumbnail_status": "failed"}}
+    )
 
-# URL에서 이미지를 다운로드하여 저장하는 함수
-async def save_image_from_url(url: str, save_path: str):
-    response = requests.get(url)
-    image = Image.open(BytesIO(response.content))
-    image.save(save_path)
+register("media_thumbnail", generate_thumbnails, on_failure=thumbnail_failed)
 
 # 게시물 create
 @router.post("/{type}/create", response_model=MediaPost, dependencies=[Depends(get_current_username)])
@@ -46,7 +59,8 @@ async def create_media_post(
         title: str = Form(...), 
         url: str = Form(...), 
         files: List[UploadFile] = File(None), 
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
     ):
     if username != "superadmin" and username != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -54,24 +68,23 @@ async def create_media_post(
     if type != "media":
         raise HTTPException(status_code=400, detail="Invalid type")
     
-    post_dict = {"title": title, "url": url, "files": [], "thumbnail": None}
+    post_dict = {"title": title, "url": url, "files": [], "thumbnail": None, "thumbnails": None, "thumbnail_status": "ready"}
     
     if files:  # 파일이 있는 경우
-        for file in files:
-            file_location = f"files/{file.filename}"  # 파일 경로 설정
-            async with aiofiles.open(file_location, 'wb') as out_file:  # 비동기 파일 쓰기
-                file_content = await file.read()  # 파일 읽기
-                await out_file.write(file_content)  # 파일 쓰기
-            post_dict['files'].append(file_location)  # 딕셔너리에 파일 경로 추가
-            post_dict['thumbnail'] = file_location  # 썸네일로 사용
+        post_dict['files'] = await file_store.put_uploads(db, files)  # 내용 기반 저장소에 저장
+        post_dict['thumbnail'] = post_dict['files'][-1]['path']  # 썸네일로 사용
     
-    if not post_dict['thumbnail']:  # 썸네일이 없을 경우 URL에서 이미지 다운로드
-        thumbnail_path = f"files/{title}_thumbnail.jpg"
-        await save_image_from_url(url, thumbnail_path)
-        post_dict['thumbnail'] = thumbnail_path
+    if not post_dict['thumbnail']:  # 썸네일이 없을 경우 URL 이미지로 나중에 생성
+        post_dict['thumbnail_status'] = "pending"
     
-    result = await db[type].insert_one(post_dict)  # MongoDB에 게시물 삽입
+    try:
+        result = await db[type].insert_one(post_dict)  # MongoDB에 게시물 삽입
+    except Exception:
+        await file_store.release_all(db, blob_ids(post_dict['files']))  # 삽입 실패 시 새로 올린 파일 참조 해제
+        raise
     post_dict["_id"] = str(result.inserted_id)  # 삽입된 문서의 ID를 딕셔너리에 추가    
+    if post_dict['thumbnail_status'] == "pending":  # 썸네일 생성 작업 등록
+        await job_queue.enqueue(db, "media_thumbnail", {"type": type, "post_id": post_dict["_id"], "url": url})
     return post_dict  # 생성된 게시물 반환
 
 # 게시물 update
@@ -82,7 +95,8 @@ async def update_media_post(
         title: str = Form(...), 
         url: str = Form(...), 
         files: List[UploadFile] = File(None), 
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
     ):
     if username != "superadmin" and username != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -90,32 +104,33 @@ async def update_media_post(
     if type != "media":
         raise HTTPException(status_code=400, detail="Invalid type")
 
-    post_dict = {"title": title, "url": url, "files": [], "thumbnail": None}
+    post_dict = {"title": title, "url": url, "files": [], "thumbnail": None, "thumbnails": None, "thumbnail_status": "ready"}
     
     if files:  # 파일이 있는 경우
-        for file in files:
-            file_location = f"files/{file.filename}"  # 파일 경로 설정
-            async with aiofiles.open(file_location, 'wb') as out_file:  # 비동기 파일 쓰기
-                file_content = await file.read()  # 파일 읽기
-                await out_file.write(file_content)  # 파일 쓰기
-            post_dict['files'].append(file_location)  # 딕셔너리에 파일 경로 추가
-            post_dict['thumbnail'] = file_location  # 썸네일로 사용
+        post_dict['files'] = await file_store.put_uploads(db, files)  # 내용 기반 저장소에 저장
+        post_dict['thumbnail'] = post_dict['files'][-1]['path']  # 썸네일로 사용
     
-    if not post_dict['thumbnail']:  # 썸네일이 없을 경우 URL에서 이미지 다운로드
-        thumbnail_path = f"files/{title}_thumbnail.jpg"
-        await save_image_from_url(url, thumbnail_path)
-        post_dict['thumbnail'] = thumbnail_path
+    if not post_dict['thumbnail']:  # 썸네일이 없을 경우 URL 이미지로 나중에 생성
+        post_dict['thumbnail_status'] = "pending"
     
-    # 문서 업데이트
-    result = await db[type].update_one(
-        {"_id": ObjectId(post_id)},  # 특정 문서 조건
-        {"$set": post_dict}  # 문서를 업데이트
-    )
+    # 문서 업데이트 (이전 첨부 파일을 알기 위해 수정 전 문서를 받음)
+    try:
+        old_post = await db[type].find_one_and_update(
+            {"_id": ObjectId(post_id)},  # 특정 문서 조건
+            {"$set": post_dict}  # 문서를 업데이트
+        )
+    except Exception:
+        await file_store.release_all(db, blob_ids(post_dict['files']))  # 수정 실패 시 새로 올린 파일 참조 해제
+        raise
     
-    if result.modified_count == 0:
+    if old_post is None:
+        await file_store.release_all(db, blob_ids(post_dict['files']))  # 새로 올린 파일 참조 해제
         raise HTTPException(status_code=404, detail="Post not found")
+    await file_store.release_all(db, blob_ids(old_post.get('files')))  # 이전 첨부 파일 참조 해제
+    if post_dict['thumbnail_status'] == "pending":  # 썸네일 생성 작업 등록
+        await job_queue.enqueue(db, "media_thumbnail", {"type": type, "post_id": post_id, "url": url})
     
-    updated_post = await db[type].find_one({"_id": ObjectId(post_id)})
+    updated_post = {**old_post, **post_dict}
     updated_post["_id"] = str(updated_post["_id"])  # ObjectId를 문자열로 변환    
     return updated_post  # 업데이트된 게시물 반환
 
@@ -124,7 +139,8 @@ async def update_media_post(
 async def delete_media_post(
         type: str, 
         post_id: str, 
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
         ):
     if username != "superadmin" and username != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -132,15 +148,83 @@ async def delete_media_post(
     if type != "media":
         raise HTTPException(status_code=400, detail="Invalid type")
 
-    result = await db[type].delete_one({"_id": ObjectId(post_id)})
+    deleted_post = await db[type].find_one_and_delete({"_id": ObjectId(post_id)}, projection={"files": 1})
     
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Post not found")    
+    if deleted_post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    await file_store.release_all(db, blob_ids(deleted_post.get('files')))  # 첨부 파일 참조 해제
     return {"message": "Deleted successfully"}
 
+# 일괄 작업 (bulk.py): 가져오기 항목과 부분 수정 항목
+# URL을 바꾸면 썸네일을 다시 만들어야 하므로 URL 수정은 단건 수정 API로 한다.
+class MediaPostImport(BaseModel):
+    title: str  # 제목
+    url: str  # URL 주소
+
+class MediaPostPatch(BaseModel):
+    title: str = None  # 제목
+    class Config:
+        extra = "forbid"  # url 등 수정할 수 없는 필드는 항목 오류로
+
+POST_DEFAULTS = {"files": [], "thumbnail": None, "thumbnails": None, "thumbnail_status": "pending"}
+
+# 가져온 게시물의 썸네일 생성 작업 등록
+async def enqueue_thumbnails(db: AsyncIOMotorDatabase, board: str, posts: List[dict]):
+    await job_queue.enqueue_many(db, "media_thumbnail", [
+        {"type": board, "post_id": str(post["_id"]), "url": post["url"]} for post in posts
+    ])
+
+# 게시물 일괄 가져오기, 본문은 NDJSON (한 줄에 {"title": ..., "url": ...})
+@router.post("/{type}/bulk/import", response_model=BulkResult, dependencies=[Depends(get_current_username)])
+async def import_media_posts(
+        type: str,
+        request: Request,
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if username != "superadmin" and username != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    if type != "media":
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    return await bulk.import_posts(db, type, request.stream(), MediaPostImport, POST_DEFAULTS, numbered=False, after_insert=enqueue_thumbnails)
+
+# 게시물 일괄 삭제
+@router.post("/{type}/bulk/delete", response_model=BulkResult, dependencies=[Depends(get_current_username)])
+async def bulk_delete_media_posts(
+        type: str,
+        body: BulkIds,
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if username != "superadmin" and username != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    if type != "media":
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    return await bulk.delete_posts(db, type, body.ids, numbered=False)
+
+# 게시물 일괄 수정 (제목)
+@router.post("/{type}/bulk/update", response_model=BulkResult, dependencies=[Depends(get_current_username)])
+async def bulk_update_media_posts(
+        type: str,
+        body: BulkUpdate,
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if username != "superadmin" and username != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    if type != "media":
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    return await bulk.update_posts(db, type, body.posts, MediaPostPatch)
+
 # 게시물 read
 @router.get("/{type}/{post_id}", response_model=MediaPost)
-async def get_media_post(type: str, post_id: str):
+async def get_media_post(type: str, post_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     if type != "media":
         raise HTTPException(status_code=400, detail="Invalid type")
     
@@ -0,0 +1,191 @@
+################################################################################
+###################################성능 지표#####################################
+################################################################################
+# 요청/DB 명령 지표를 수집해 /metrics에서 Prometheus 텍스트 형식으로 제공한다.
+# - MetricsMiddleware: 라우트 템플릿별 지연 히스토그램, 상태 코드별 요청 수, 처리 중 요청 수
+# - command_listener: pymongo 명령 모니터링으로 명령/컬렉션별 소요 시간 (게시판마다 컬렉션이 다르므로 게시판별로 구분된다)
+# 지표는 워커 프로세스별로 집계되며, 요청당 비용은 시간 측정 두 번과 사전 조회 몇 번이다.
+
+from bisect import bisect_left
+from pymongo import monitoring
+from typing import Dict, Iterable, List, Tuple
+import threading
+import time
+import admission
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # 초 단위
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# 집계할 명령 (그 외는 other)
+COMMANDS = {"find", "getMore", "insert", "update", "delete", "findAndModify", "aggregate", "count", "distinct", "bulkWrite", "createIndexes"}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+# 요청 지표: (method, route) -> 히스토그램, (method, route, status) -> 요청 수, 종류 -> 처리 중 요청 수
+request_latency: Dict[Tuple[str, str], Histogram] = {}
+request_count: Dict[Tuple[str, str, int], int] = {}
+in_flight: Dict[str, int] = {name: 0 for name in admission.DEFAULT_LIMITS}
+
+# DB 명령 지표: (command, collection) -> 히스토그램, 실패 수
+command_latency: Dict[Tuple[str, str], Histogram] = {}
+command_errors: Dict[Tuple[str, str], int] = {}
+_command_lock = threading.Lock()  # 리스너는 드라이버 스레드에서도 호출된다
+
+# id(라우트) -> 전체 경로 템플릿 (include_router prefix 포함), 라우트는 앱과 수명이 같다
+_templates: Dict[int, str] = {}
+
+
+# 요청이 매칭된 라우트의 경로 템플릿 (/mainbusiness/{type}/{post_id}), 매칭되지 않았으면 unmatched
+def route_template(scope: dict) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = _templates.get(id(route))
+    if template is None:
+        # 라우트 경로에 prefix가 빠져 있으면 요청 경로에서 고정 prefix를 찾아 붙인다 (라우트마다 한 번)
+        path = scope["path"]
+        template = route.path
+        for index, char in enumerate(path):
+            if char == "/" and route.path_regex.match(path[index:]):
+                template = path[:index] + route.path
+                break
+        _templates[id(route)] = template
+    return template
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_class = admission.classify(scope)
+        status = 500
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight[request_class] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight[request_class] -= 1
+            key = (scope["method"], route_template(scope))
+            histogram = request_latency.get(key)
+            if histogram is None:
+                histogram = request_latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(elapsed)
+            count_key = key + (status,)
+            request_count[count_key] = request_count.get(count_key, 0) + 1
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._pending: Dict[Tuple[int, object], Tuple[str, str]] = {}  # (request_id, 연결) -> (명령, 컬렉션)
+
+    def started(self, event):
+        command = event.command_name if event.command_name in COMMANDS else "other"
+        target = event.command.get(event.command_name)
+        collection = event.command.get("collection") if command == "getMore" else target
+        self._pending[(event.request_id, event.connection_id)] = (command, collection if isinstance(collection, str) else "")
+
+    def succeeded(self, event):
+        key = self._pending.pop((event.request_id, event.connection_id), None)
+        if key is not None:
+            with _command_lock:
+                histogram = command_latency.get(key)
+                if histogram is None:
+                    histogram = command_latency[key] = Histogram(COMMAND_BUCKETS)
+                histogram.observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        key = self._pending.pop((event.request_id, event.connection_id), None)
+        if key is not None:
+            with _command_lock:
+                command_errors[key] = command_errors.get(key, 0) + 1
+
+
+command_listener = CommandMetrics()
+
+
+################################################################################
+##############################Prometheus 텍스트 형식##############################
+################################################################################
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _histogram_lines(name: str, help_text: str, histograms: Iterable, label_names: Tuple[str, ...]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in histograms:
+        labels = _labels(**dict(zip(label_names, key)))
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += histogram.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+def _counter_lines(name: str, kind: str, help_text: str, values: Iterable, label_names: Tuple[str, ...]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for key, value in values:
+        lines.append(f"{name}{{{_labels(**dict(zip(label_names, key)))}}} {value}")
+    return lines
+
+
+def render() -> str:
+    with _command_lock:
+        commands = [(key, histogram) for key, histogram in command_latency.items()]
+        errors = list(command_errors.items())
+    admission_stats = admission.stats()
+    lines = []
+    lines += _histogram_lines("http_request_duration_seconds", "HTTP request latency by route template",
+                              list(request_latency.items()), ("method", "route"))
+    lines += _counter_lines("http_requests_total", "counter", "HTTP requests by route template and status",
+                            list(request_count.items()), ("method", "route", "status"))
+    lines += _counter_lines("http_requests_in_flight", "gauge", "HTTP requests being processed by request class",
+                            [((name,), value) for name, value in in_flight.items()], ("class",))
+    lines += _histogram_lines("mongodb_command_duration_seconds", "MongoDB command latency by command and collection",
+                              commands, ("command", "collection"))
+    lines += _counter_lines("mongodb_command_errors_total", "counter", "Failed MongoDB commands by command and collection",
+                            errors, ("command", "collection"))
+    lines += _counter_lines("admission_queued_requests", "gauge", "Requests waiting in the admission queue",
+                            [((name,), stats["queued"]) for name, stats in admission_stats.items()], ("class",))
+    lines += _counter_lines("admission_rejected_total", "counter", "Requests rejected by admission control",
+                            [((name,), stats["rejected"]) for name, stats in admission_stats.items()], ("class",))
+    return "\n".join(lines) + "\n"
+
+
+# main.py에서 호출: 미들웨어와 DB 명령 리스너 등록 (connect_db 전에 호출해야 리스너가 적용된다)
+def install(app):
+    import database
+    database.add_listener(command_listener)
+    app.add_middleware(MetricsMiddleware)
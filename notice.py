@@ -8,56 +8,89 @@
 ################################게시글조회 test O###############################
 ###############################################################################
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Union
+from datetime import datetime
 from bson import ObjectId
-import aiofiles
-from motor.motor_asyncio import AsyncIOMotorClient
-import os  # os 모듈을 가져와서 환경 변수를 읽기 위함
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from auth import get_user_role, get_current_username
+from database import get_db
+from serialization import TrustedRoute
+from storage import Attachment, file_store, blob_ids
+from pagination import fetch_page, SUMMARY_PROJECTION, MAX_LIMIT
+from counters import next_post_number, decrement_post_count, get_post_count
+from view_counter import view_buffer
+from cache import feed_cache
+import comments as comment_store
+import bulk
+from bulk import BulkResult, BulkIds, BulkUpdate
+from search import index_post, remove_post, register_boards
 
 # FastAPI의 APIRouter 객체 생성, 이를 통해 라우트를 그룹화
-router = APIRouter()
-
-# MongoDB 클라이언트를 설정하고 데이터베이스 연결
-client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/kustii"))
-db = client["board"]
+router = APIRouter(route_class=TrustedRoute)  # DB 문서를 다시 검증하지 않고 바로 직렬화
 
 # Pydantic 모델 정의, 요청 데이터 검증을 위함
 class NoticePost(BaseModel):
     id: Optional[str] = Field(alias="_id")  # MongoDB ObjectId를 문자열로 변환하여 포함
     title: str  # 제목
     content: str  # 최대 3000자 내용
-    files: Optional[List[str]] = None  # 파일 경로 리스트
-    comments: Optional[List['CommentInDB']] = []
+    files: Optional[List[Union[Attachment, str]]] = None  # 첨부 파일 목록 (기존 게시물은 경로 문자열)
+    comment_count: int = 0  # 댓글 수 (댓글은 comments 컬렉션에 저장)
     views: int = 0  # 조회수 필드 추가
+    number: Optional[int] = None  # 글 번호 (생성 시 발급)
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
     
+# 게시물 목록에 쓰는 요약 모델 (본문 전체, 댓글 제외)
+class NoticePostSummary(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    number: Optional[int] = None  # 글 번호
+    title: str  # 제목
+    excerpt: str = ""  # 본문 미리보기
+    views: int = 0  # 조회수
+    file_count: int = 0  # 첨부 파일 수
+    comment_count: int = 0  # 댓글 수
+    has_files: bool = False  # 파일 존재 여부
+    class Config:
+        allow_population_by_field_name = True
+
 # 게시물 목록과 페이지 정보를 포함하는 응답 모델 정의
 class NoticePostListResponse(BaseModel):
-    posts: List[NoticePost] = Field(..., description="게시물 목록")
+    posts: List[NoticePostSummary] = Field(..., description="게시물 목록")
     total_pages: int = Field(..., description="총 페이지 수")
     current_page: int = Field(..., description="현재 페이지 번호")
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서")
+    prev_cursor: Optional[str] = Field(None, description="이전 페이지 커서")
 
 class Comment(BaseModel):
     user: str
     content: str
     is_admin: bool = False
-    replies: Optional[List['CommentInDB']] = []
-    id: Optional[str]
 
 class CommentCreate(BaseModel):
     content: str
     parent_id: Optional[str] = None
 
 class CommentInDB(Comment):
-    id: Optional[str]
+    id: Optional[str] = Field(None, alias="_id")
+    post_id: Optional[str] = None
+    parent_id: Optional[str] = None  # 최상위 댓글이면 None
+    depth: int = 0  # 답글 깊이
+    reply_count: int = 0  # 직계 답글 수 (답글은 replies 엔드포인트로 따로 조회)
+    created_at: Optional[datetime] = None
+    class Config:
+        allow_population_by_field_name = True
+
+# 댓글 목록과 다음 페이지 커서를 포함하는 응답 모델
+class CommentListResponse(BaseModel):
+    comments: List[CommentInDB] = Field(..., description="댓글 목록")
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서")
 
 # 타입을 확인하는 부분
 types = ["news", "notice"]  
+register_boards(types)  # 검색 대상 게시판으로 등록
 # type : 게시글 종류
 #   news : 한미과기동맹포럼
 #   notice : 기술.인력.정보.판매.협력 알선&지원
@@ -69,7 +102,8 @@ async def create_notice_post(
         title: str = Form(...), 
         content: str = Form(...), 
         files: List[UploadFile] = File(None), 
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
     ):
     if username != "superadmin" and username != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -77,17 +111,20 @@ async def create_notice_post(
     if type not in types:
         raise HTTPException(status_code=400, detail="Invalid type")
     
-    post_dict = {"title": title, "content": content, "files": [], "comments": [], "views": 0}
+    post_dict = {"title": title, "content": content, "files": [], "comment_count": 0, "views": 0}
     
     if files:  # 파일이 있는 경우
-        for file in files:
-            file_location = f"files/{file.filename}"  # 파일 경로 설정
-            async with aiofiles.open(file_location, 'wb') as out_file:  # 비동기 파일 쓰기
-                file_content = await file.read()  # 파일 읽기
-                await out_file.write(file_content)  # 파일 쓰기
-            post_dict['files'].append(file_location)  # 딕셔너리에 파일 경로 추가
+        post_dict['files'] = await file_store.put_uploads(db, files)  # 내용 기반 저장소에 저장
     
-    result = await db[type].insert_one(post_dict)  # MongoDB에 게시물 삽입
+    post_dict["number"] = await next_post_number(db, type)  # 글 번호 발급
+    try:
+        result = await db[type].insert_one(post_dict)  # MongoDB에 게시물 삽입
+    except Exception:
+        await decrement_post_count(db, type)  # 삽입 실패 시 게시물 수 복구
+        await file_store.release_all(db, blob_ids(post_dict['files']))
+        raise
+    await index_post(db, type, result.inserted_id, title, content)  # 검색 색인 추가
+    await feed_cache.bump(db)  # 최신 게시물 피드 무효화 (모든 워커)
     post_dict["_id"] = str(result.inserted_id)  # 삽입된 문서의 ID를 딕셔너리에 추가    
     return post_dict  # 생성된 게시물 반환
 
@@ -99,7 +136,8 @@ async def update_notice_post(
         title: str = Form(...),
         content: str = Form(...),
         files: List[UploadFile] = File(None),
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
     ):
     if username != "superadmin" and username != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -107,23 +145,22 @@ async def update_notice_post(
     post_dict = {"title": title, "content": content, "files": []}
     
     if files:  # 파일이 있는 경우
-        for file in files:
-            file_location = f"files/{file.filename}"  # 파일 경로 설정
-            async with aiofiles.open(file_location, 'wb') as out_file:  # 비동기 파일 쓰기
-                file_content = await file.read()  # 파일 읽기
-                await out_file.write(file_content)  # 파일 쓰기
-            post_dict['files'].append(file_location)  # 딕셔너리에 파일 경로 추가
+        post_dict['files'] = await file_store.put_uploads(db, files)  # 내용 기반 저장소에 저장
     
-    # 문서 업데이트
-    result = await db[type].update_one(
+    # 문서 업데이트 (이전 첨부 파일을 알기 위해 수정 전 문서를 받음)
+    old_post = await db[type].find_one_and_update(
         {"_id": ObjectId(post_id)},  # 특정 문서 조건
         {"$set": post_dict}  # 문서를 업데이트
     )
     
-    if result.modified_count == 0:
+    if old_post is None:
+        await file_store.release_all(db, blob_ids(post_dict['files']))  # 새로 올린 파일 참조 해제
         raise HTTPException(status_code=404, detail="Post not found")
+    await file_store.release_all(db, blob_ids(old_post.get('files')))  # 이전 첨부 파일 참조 해제
+    await index_post(db, type, old_post["_id"], title, content)  # 검색 색인 갱신
+    await feed_cache.bump(db)  # 최신 게시물 피드 무효화 (모든 워커)
     
-    updated_post = await db[type].find_one({"_id": ObjectId(post_id)})
+    updated_post = {**old_post, **post_dict}
     updated_post["_id"] = str(updated_post["_id"])  # ObjectId를 문자열로 변환
     return updated_post  # 업데이트된 게시물 반환
 
@@ -132,28 +169,96 @@ async def update_notice_post(
 async def delete_notice_post(
         type: str,
         post_id: str,
-        username: str = Depends(get_user_role)
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
         ):
     if username != "superadmin" and username != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    result = await db[type].delete_one({"_id": ObjectId(post_id)})
+    deleted_post = await db[type].find_one_and_delete({"_id": ObjectId(post_id)}, projection={"files": 1})
     
-    if result.deleted_count == 0:
+    if deleted_post is None:
         raise HTTPException(status_code=404, detail="Post not found")
+    await decrement_post_count(db, type)
+    await file_store.release_all(db, blob_ids(deleted_post.get('files')))  # 첨부 파일 참조 해제
+    await comment_store.delete_post_comments(db, type, deleted_post["_id"])  # 게시물의 댓글 삭제
+    await remove_post(db, type, deleted_post["_id"])  # 검색 색인에서 제거
+    await feed_cache.bump(db)  # 최신 게시물 피드 무효화 (모든 워커)
     return {"message": "Deleted successfully"}
 
+# 일괄 작업 (bulk.py): 가져오기 항목과 부분 수정 항목
+class NoticePostImport(BaseModel):
+    title: str  # 제목
+    content: str  # 내용
+    views: int = 0  # 기존 조회수
+
+class NoticePostPatch(BaseModel):
+    title: str = None  # 제목
+    content: str = None  # 내용
+    class Config:
+        extra = "forbid"  # 수정할 수 없는 필드는 항목 오류로
+
+POST_DEFAULTS = {"files": [], "comment_count": 0, "views": 0}
+
+# 게시물 일괄 가져오기, 본문은 NDJSON (한 줄에 {"title": ..., "content": ...})
+@router.post("/{type}/bulk/import", response_model=BulkResult, dependencies=[Depends(get_current_username)])
+async def import_notice_posts(
+        type: str,
+        request: Request,
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if username != "superadmin" and username != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    if type not in types:
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    return await bulk.import_posts(db, type, request.stream(), NoticePostImport, POST_DEFAULTS, numbered=True, after_insert=bulk.index_board_posts)
+
+# 게시물 일괄 삭제
+@router.post("/{type}/bulk/delete", response_model=BulkResult, dependencies=[Depends(get_current_username)])
+async def bulk_delete_notice_posts(
+        type: str,
+        body: BulkIds,
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if username != "superadmin" and username != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    if type not in types:
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    return await bulk.delete_posts(db, type, body.ids, numbered=True, after_delete=bulk.cleanup_board_posts)
+
+# 게시물 일괄 수정 (제목/내용)
+@router.post("/{type}/bulk/update", response_model=BulkResult, dependencies=[Depends(get_current_username)])
+async def bulk_update_notice_posts(
+        type: str,
+        body: BulkUpdate,
+        username: str = Depends(get_user_role),
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if username != "superadmin" and username != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    if type not in types:
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    return await bulk.update_posts(db, type, body.posts, NoticePostPatch, after_update=bulk.index_board_posts)
+
 # 게시물 read
 @router.get("/{type}/{post_id}", response_model=NoticePost)
-async def get_notice_post(type: str, post_id: str):
+async def get_notice_post(type: str, post_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     if type not in types:
         raise HTTPException(status_code=400, detail="Invalid type")
     
-    # 조회수 증가
-    await db[type].update_one({"_id": ObjectId(post_id)}, {"$inc": {"views": 1}})
-        
-    post = await db[type].find_one({"_id": ObjectId(post_id)})  # 특정 게시물 조회
+    post = await db[type].find_one({"_id": ObjectId(post_id)}, {"comments": 0})  # 특정 게시물 조회 (이전 형식의 포함 댓글 제외)
     if post:
+        # 조회수 증가 (버퍼에 모았다가 주기적으로 일괄 반영)
+        view_buffer.add(type, post["_id"])
+        post["views"] = post.get("views", 0) + view_buffer.pending(type, post["_id"])
         post["_id"] = str(post["_id"])  # ObjectId를 문자열로 변환
         return post
     else:
@@ -161,26 +266,38 @@ async def get_notice_post(type: str, post_id: str):
     
 # 게시물 목록 조회
 @router.get("/{type}", response_model=NoticePostListResponse)
-async def get_notice_posts(type: str, page: int = 1, limit: int = 10):
+async def get_notice_posts(
+        type: str,
+        page: Optional[int] = None,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
     if type not in types:
         raise HTTPException(status_code=400, detail="Invalid type")
     
+    limit = min(max(limit, 1), MAX_LIMIT)  # 페이지 크기 제한 (총 페이지 수 계산에도 같은 값 사용)
+
+    # 최신순 정렬, cursor가 있으면 skip 없이 키셋으로 이동 (page도 주면 커서 위치에서 건너뜀)
+    posts, page, next_cursor, prev_cursor = await fetch_page(db[type], page, limit, cursor, SUMMARY_PROJECTION)
     skip = (page - 1) * limit
-    posts = await db[type].find().skip(skip).limit(limit).to_list(length=limit)
-    total_posts = await db[type].count_documents({})
+    total_posts = await get_post_count(db, type)  # 카운터 컬렉션에서 게시물 수 조회
     total_pages = (total_posts + limit - 1) // limit  # 총 페이지 수 계산
 
     formatted_posts = []
     for i, post in enumerate(posts, start=1):
+        post["views"] = post.get("views", 0) + view_buffer.pending(type, post["_id"])  # 반영 대기 중인 조회수 포함
         post["_id"] = str(post["_id"])  # ObjectId를 문자열로 변환
-        post["has_files"] = bool(post.get("files"))  # 파일 존재 여부 추가
-        post["number"] = i + skip  # 글 번호 추가
+        post["has_files"] = post.get("file_count", 0) > 0  # 파일 존재 여부 추가
+        post.setdefault("number", i + skip)  # 번호가 없는 기존 게시물은 순번으로 대체
         formatted_posts.append(post)
 
     return {
         "posts": formatted_posts,
         "total_pages": total_pages,
-        "current_page": page
+        "current_page": page,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
     }
 
 
@@ -201,82 +318,72 @@ async def get_notice_posts(type: str, page: int = 1, limit: int = 10):
 #############################공지사항 게시판 댓글기능#############################
 ################################################################################
 
-# 댓글 추가
+# 댓글 추가 (parent_id가 있으면 답글)
 @router.post("/{type}/{post_id}/comments", response_model=CommentInDB)
 async def add_comment(
     type: str,
     post_id: str,
     comment: CommentCreate,
     username: str = Depends(get_current_username),
-    user_role: str = Depends(get_user_role)
+    user_role: str = Depends(get_user_role),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
+    if type not in types:
+        raise HTTPException(status_code=400, detail="Invalid type")
+
     is_admin = user_role in ["admin", "superadmin"]
-    comment_dict = {
-        "user": username,
-        "content": comment.content,
-        "is_admin": is_admin,
-        "replies": []
-    }
-    
-    post = await db[type].find_one({"_id": ObjectId(post_id)})
+    post = await db[type].find_one({"_id": ObjectId(post_id)}, {"_id": 1})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    if comment.parent_id:
-        parent_comment = await db["comments"].find_one({"_id": ObjectId(comment.parent_id)})
-        if not parent_comment:
-            raise HTTPException(status_code=404, detail="Parent comment not found")
-        
-        await db["comments"].update_one(
-            {"_id": ObjectId(comment.parent_id)},
-            {"$push": {"replies": comment_dict}}
-        )
-    else:
-        result = await db["comments"].insert_one(comment_dict)
-        comment_dict["_id"] = str(result.inserted_id)
-        
-        await db[type].update_one(
-            {"_id": ObjectId(post_id)},
-            {"$push": {"comments": comment_dict}}
-        )
-    
-    return comment_dict
+    return await comment_store.add_comment(db, type, post["_id"], username, comment.content, is_admin, comment.parent_id)
 
-# 댓글 조회
-@router.get("/{type}/{post_id}/comments", response_model=List[CommentInDB])
-async def get_comments(type: str, post_id: str):
+# 댓글 조회 (최상위 댓글만 작성순으로 페이지 단위 조회, 답글은 replies로 조회)
+@router.get("/{type}/{post_id}/comments", response_model=CommentListResponse)
+async def get_comments(
+        type: str,
+        post_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
     if type not in types:
         raise HTTPException(status_code=400, detail="Invalid type")
-        
-    post = await db[type].find_one({"_id": ObjectId(post_id)})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    return post.get("comments", [])
 
-# 댓글 삭제
+    comments, next_cursor = await comment_store.list_comments(db, type, ObjectId(post_id), None, cursor, limit)
+    return {"comments": comments, "next_cursor": next_cursor}
+
+# 답글 조회 (댓글 스레드를 펼칠 때 불러옴)
+@router.get("/{type}/{post_id}/comments/{comment_id}/replies", response_model=CommentListResponse)
+async def get_replies(
+        type: str,
+        post_id: str,
+        comment_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if type not in types:
+        raise HTTPException(status_code=400, detail="Invalid type")
+
+    comments, next_cursor = await comment_store.list_comments(db, type, ObjectId(post_id), ObjectId(comment_id), cursor, limit)
+    return {"comments": comments, "next_cursor": next_cursor}
+
+# 댓글 삭제 (답글 포함)
 @router.delete("/{type}/{post_id}/comments/{comment_id}", response_model=dict, dependencies=[Depends(get_current_username)])
 async def delete_comment(
     type: str,
     post_id: str,
     comment_id: str,
     username: str = Depends(get_current_username),
-    user_role: str = Depends(get_user_role)
+    user_role: str = Depends(get_user_role),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     if user_role not in ["admin", "superadmin"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    post = await db[type].find_one({"_id": ObjectId(post_id)})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    if type not in types:
+        raise HTTPException(status_code=400, detail="Invalid type")
 
-    result = await db["comments"].delete_one({"_id": ObjectId(comment_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Comment not found")
-    
-    await db[type].update_one(
-        {"_id": ObjectId(post_id)},
-        {"$pull": {"comments": {"_id": ObjectId(comment_id)}}}
-    )
-    
-    return {"message": "Comment deleted successfully"}
\ No newline at end of file
+    await comment_store.delete_comment(db, type, ObjectId(post_id), comment_id)
+    return {"message": "Comment deleted successfully"}
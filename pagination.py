@@ -0,0 +1,96 @@
+################################################################################
+#############################게시판 커서 페이지네이션#############################
+################################################################################
+# 최신순(_id 내림차순)으로 정렬하고, skip 대신 마지막으로 본 _id 기준으로
+# 다음/이전 페이지를 조회한다. _id 기본 인덱스가 정렬과 범위 조건을 모두 처리하므로
+# 페이지가 깊어져도 조회 비용이 일정하다.
+
+from fastapi import HTTPException
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import List, Optional, Tuple
+import base64
+import json
+
+# 커서 방향
+NEXT = "next"
+PREV = "prev"
+
+EXCERPT_LENGTH = 200  # 목록에 보여줄 본문 미리보기 글자 수
+MAX_LIMIT = 100  # 한 페이지 최대 게시물 수
+
+# 목록 조회용 projection: 본문 전체와 댓글/파일 배열 대신 요약 필드만 가져온다
+SUMMARY_PROJECTION = {
+    "title": 1,
+    "number": 1,
+    "views": 1,
+    "excerpt": {"$substrCP": [{"$ifNull": ["$content", ""]}, 0, EXCERPT_LENGTH]},
+    "file_count": {"$size": {"$ifNull": ["$files", []]}},
+    # 댓글은 comments 컬렉션에 있고 게시물에는 댓글 수만 저장 (이전 형식은 포함된 배열 크기)
+    "comment_count": {"$ifNull": ["$comment_count", {"$size": {"$ifNull": ["$comments", []]}}]},
+}
+
+
+# 커서 인코딩: 기준 문서 _id, 도착 페이지 번호, 방향을 불투명한 문자열로 변환
+def encode_cursor(anchor_id: ObjectId, page: int, direction: str) -> str:
+    payload = json.dumps({"id": str(anchor_id), "p": page, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+# 커서 디코딩, 잘못된 커서는 400 에러
+def decode_cursor(cursor: str) -> Tuple[ObjectId, int, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload["d"]
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+        return ObjectId(payload["id"]), max(int(payload["p"]), 1), direction
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# 한 페이지 조회
+# cursor가 있으면 키셋 조회(페이지 번호는 커서에 담긴 값 사용),
+# 없으면 기존 page 방식과 호환되도록 정렬된 skip 조회를 한다.
+# cursor와 다른 page를 함께 주면 커서 위치에서 그 페이지로 건너뛴다
+# (예: 5페이지의 next 커서 + page=7 이면 커서 뒤에서 한 페이지만 skip).
+# 커서 방향과 반대쪽 페이지는 처음부터 skip한다.
+# 반환값: (문서 목록, 현재 페이지, 다음 커서, 이전 커서)
+async def fetch_page(
+        collection,
+        page: Optional[int] = None,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], int, Optional[str], Optional[str]]:
+    limit = min(max(limit, 1), MAX_LIMIT)
+    if cursor:
+        anchor_id, target, direction = decode_cursor(cursor)
+        page = target if page is None else max(page, 1)
+        if direction == NEXT and page >= target:
+            query = collection.find({"_id": {"$lt": anchor_id}}, projection).sort("_id", -1).skip((page - target) * limit)
+        elif direction == PREV and page <= target:
+            query = collection.find({"_id": {"$gt": anchor_id}}, projection).sort("_id", 1).skip((target - page) * limit)
+        else:
+            direction = NEXT
+            query = collection.find({}, projection).sort("_id", -1).skip((page - 1) * limit)
+    else:
+        page = max(page or 1, 1)
+        direction = NEXT
+        query = collection.find({}, projection).sort("_id", -1).skip((page - 1) * limit)
+
+    # 한 개 더 조회해서 다음(이전) 페이지 존재 여부를 판단
+    docs = await query.limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    if direction == NEXT:
+        has_next, has_prev = has_more, page > 1
+    else:
+        docs.reverse()  # 오름차순으로 조회했으므로 최신순으로 되돌림
+        has_next, has_prev = True, has_more and page > 1
+
+    next_cursor = encode_cursor(docs[-1]["_id"], page + 1, NEXT) if docs and has_next else None
+    prev_cursor = encode_cursor(docs[0]["_id"], page - 1, PREV) if docs and has_prev else None
+    return docs, page, next_cursor, prev_cursor
@@ -0,0 +1,258 @@
+################################################################################
+###################################게시물 검색###################################
+################################################################################
+# 게시판 전체 검색용 역색인. 게시물마다 (용어, 게시판, 게시물, 가중치) 문서를 저장한다.
+#   { "t": "과학", "b": "forum", "p": ObjectId, "w": 12 }
+# 한글/한자/가나는 형태소 분석 없이 글자 2-gram으로, 영문/숫자는 단어 단위로 색인한다.
+#   "과학기술 협력" -> 과학, 학기, 기술, 협력
+# 검색어도 같은 방식으로 나누고 모든 용어를 포함한 게시물만 가중치 합으로 정렬한다.
+# 용어별 문서 빈도는 search_terms에 따로 유지한다.
+#   { "_id": "과학", "df": 1234 }
+# 검색은 문서 빈도가 가장 낮은 용어의 게시물(많으면 가중치 상위 TERM_POSTINGS_LIMIT개)을 후보로 삼고,
+# 나머지 용어는 후보 게시물 안에서만 확인한다. 흔한 2-gram("하는", "있다")이 섞여도 읽는 색인 항목 수는
+# 게시물 수와 관계없이 제한된다. 조회는 (t, w), (t, p) 인덱스만 사용한다.
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from collections import Counter
+from pymongo import UpdateOne
+from typing import Dict, List, Optional
+import asyncio
+import re
+from database import get_db
+from serialization import TrustedRoute
+from pagination import SUMMARY_PROJECTION
+
+router = APIRouter(route_class=TrustedRoute)  # DB 문서를 다시 검증하지 않고 바로 직렬화
+
+COLLECTION = "search_postings"
+TERMS_COLLECTION = "search_terms"  # 용어별 문서 빈도 (동시 수정 시 약간 어긋날 수 있는 추정값)
+TERM_POSTINGS_LIMIT = 5000  # 후보로 읽을 최대 색인 항목 수 (더 흔한 용어는 가중치 상위만, 전체 결과 수는 근사값)
+TITLE_WEIGHT = 10  # 제목에 나온 용어 가중치
+MAX_TERM_FREQUENCY = 10  # 본문 반복 횟수 상한 (같은 단어 반복으로 순위가 오르지 않게)
+MAX_QUERY_TERMS = 16
+MAX_LIMIT = 50
+
+WORD_PATTERN = re.compile(r"\w+")
+CJK_PATTERN = re.compile(r"[ᄀ-ᇿ぀-ヿ㄰-㆏㐀-鿿가-힯]+")  # 한글, 가나, 한자
+
+# 검색 대상 게시판 (각 게시판 라우터에서 등록)
+searchable_boards: List[str] = []
+
+
+def register_boards(boards: List[str]):
+    for board in boards:
+        if board not in searchable_boards:
+            searchable_boards.append(board)
+
+
+# 텍스트를 색인 용어 목록으로 변환 (중복 포함)
+def tokenize(text: str) -> List[str]:
+    terms = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        position = 0
+        for run in CJK_PATTERN.finditer(word):
+            terms.extend(_words(word[position:run.start()]))
+            chars = run.group()
+            if len(chars) == 1:
+                terms.append(chars)
+            else:
+                terms.extend(chars[i:i + 2] for i in range(len(chars) - 1))
+            position = run.end()
+        terms.extend(_words(word[position:]))
+    return terms
+
+
+def _words(text: str) -> List[str]:
+    return [part for part in text.split("_") if part]
+
+
+# 게시물 하나의 용어별 가중치 계산
+def term_weights(title: str, content: str) -> Dict[str, int]:
+    weights = {term: min(count, MAX_TERM_FREQUENCY) for term, count in Counter(tokenize(content or "")).items()}
+    for term in set(tokenize(title or "")):
+        weights[term] = weights.get(term, 0) + TITLE_WEIGHT
+    return weights
+
+
+def _postings(board: str, posts: List[dict]) -> List[dict]:
+    return [
+        {"t": term, "b": board, "p": post["_id"], "w": weight}
+        for post in posts
+        for term, weight in term_weights(post.get("title", ""), post.get("content", "")).items()
+    ]
+
+
+# 게시물들에 색인되어 있는 용어 (게시물마다 한 번씩)
+async def _indexed_terms(db: AsyncIOMotorDatabase, board: str, post_ids: List[ObjectId]) -> Counter:
+    return Counter([posting["t"] async for posting in db[COLLECTION].find({"b": board, "p": {"$in": post_ids}}, {"t": 1, "_id": 0})])
+
+
+# 문서 빈도 갱신: 새로 색인된 용어는 +1, 빠진 용어는 -1
+async def _update_frequencies(db: AsyncIOMotorDatabase, added: Counter, removed: Counter):
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    requests = [UpdateOne({"_id": term}, {"$inc": {"df": delta}}, upsert=True) for term, delta in deltas.items() if delta]
+    if requests:
+        await db[TERMS_COLLECTION].bulk_write(requests, ordered=False)
+
+
+# 여러 게시물의 색인을 한 번에 갱신 (기존 용어를 지우고 다시 넣는다)
+async def index_posts(db: AsyncIOMotorDatabase, board: str, posts: List[dict]):
+    if not posts:
+        return
+    post_ids = [post["_id"] for post in posts]
+    removed = await _indexed_terms(db, board, post_ids)
+    await db[COLLECTION].delete_many({"b": board, "p": {"$in": post_ids}})
+    postings = _postings(board, posts)
+    if postings:
+        await db[COLLECTION].insert_many(postings, ordered=False)
+    await _update_frequencies(db, Counter(posting["t"] for posting in postings), removed)
+
+
+# 여러 게시물을 색인에서 제거 (일괄 삭제)
+async def remove_posts(db: AsyncIOMotorDatabase, board: str, post_ids: List[ObjectId]):
+    removed = await _indexed_terms(db, board, post_ids)
+    await db[COLLECTION].delete_many({"b": board, "p": {"$in": post_ids}})
+    await _update_frequencies(db, Counter(), removed)
+
+
+# 게시물 생성/수정 시 색인 갱신
+async def index_post(db: AsyncIOMotorDatabase, board: str, post_id: ObjectId, title: str, content: str):
+    await index_posts(db, board, [{"_id": post_id, "title": title, "content": content}])
+
+
+# 게시물 삭제 시 색인에서 제거
+async def remove_post(db: AsyncIOMotorDatabase, board: str, post_id: ObjectId):
+    await remove_posts(db, board, [post_id])
+
+
+# 색인이 아직 없는지 (setup_db는 이때와 --reindex로 요청했을 때만 rebuild_index 실행)
+async def index_is_empty(db: AsyncIOMotorDatabase) -> bool:
+    return await db[COLLECTION].find_one({}, {"_id": 1}) is None
+
+
+# 기존 게시물 전체 재색인 후 문서 빈도 재계산 (setup_db에서 실행, 인덱스는 setup_db.INDEXES에 선언)
+# 임시 컬렉션에 새로 만든 뒤 renameCollection으로 교체하므로 교체 전까지 검색은 기존 색인을 그대로 쓴다.
+# 재색인 중에 작성/수정된 게시물은 새 색인에 빠질 수 있으므로 쓰기가 적을 때 실행한다.
+# indexes: 임시 컬렉션에 미리 만들 인덱스 {컬렉션 이름: [IndexModel]} (교체 직후에도 인덱스가 있도록)
+async def rebuild_index(db: AsyncIOMotorDatabase, boards: List[str], indexes: Optional[Dict[str, list]] = None):
+    postings_collection = f"{COLLECTION}_rebuild"
+    terms_collection = f"{TERMS_COLLECTION}_rebuild"
+    await db[postings_collection].drop()  # 이전에 중단된 재색인의 흔적
+    await db[terms_collection].drop()
+    for name, target in ((postings_collection, COLLECTION), (terms_collection, TERMS_COLLECTION)):
+        if indexes and indexes.get(target):
+            await db[name].create_indexes(indexes[target])
+    for board in boards:
+        async for post in db[board].find({}, {"title": 1, "content": 1}):
+            postings = _postings(board, [post])
+            if postings:
+                await db[postings_collection].insert_many(postings, ordered=False)
+    await db[postings_collection].aggregate([
+        {"$group": {"_id": "$t", "df": {"$sum": 1}}},
+        {"$out": terms_collection},
+    ]).to_list(length=None)
+    await db[postings_collection].rename(COLLECTION, dropTarget=True)
+    await db[terms_collection].rename(TERMS_COLLECTION, dropTarget=True)
+
+
+# 검색어에 맞는 (게시판, 게시물, 점수) 한 페이지와 전체 결과 수 반환
+async def search_postings(db: AsyncIOMotorDatabase, query: str, boards: List[str], skip: int, limit: int):
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], 0
+    if len(terms) == 1 and len(terms[0]) == 1:  # 한 글자 검색어는 그 글자로 시작하는 용어로 찾는다
+        term_filter = {"$regex": f"^{re.escape(terms[0])}"}
+        candidates = db[COLLECTION].find({"t": term_filter, "b": {"$in": boards}}, {"b": 1, "p": 1, "_id": 0}).limit(TERM_POSTINGS_LIMIT)
+        required = 1
+    else:
+        frequencies = {term["_id"]: term["df"] async for term in db[TERMS_COLLECTION].find({"_id": {"$in": terms}})}
+        if any(frequencies.get(term, 0) <= 0 for term in terms):  # 한 용어라도 없으면 결과 없음
+            return [], 0
+        rarest = min(terms, key=lambda term: frequencies[term])
+        # 가장 드문 용어의 게시물을 후보로 (흔한 용어뿐이면 가중치 상위 항목만)
+        candidates = db[COLLECTION].find({"t": rarest, "b": {"$in": boards}}, {"b": 1, "p": 1, "_id": 0}).sort("w", -1).limit(TERM_POSTINGS_LIMIT)
+        term_filter = {"$in": terms}
+        required = len(terms)
+    post_ids = list({posting["p"] async for posting in candidates})
+    if not post_ids:
+        return [], 0
+
+    result = await db[COLLECTION].aggregate([
+        {"$match": {"t": term_filter, "p": {"$in": post_ids}, "b": {"$in": boards}}},
+        {"$group": {"_id": {"b": "$b", "p": "$p"}, "score": {"$sum": "$w"}, "hits": {"$sum": 1}}},
+        {"$match": {"hits": {"$gte": required}}},  # 모든 용어를 포함한 게시물만
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "page": [{"$sort": {"score": -1, "_id.p": -1}}, {"$skip": skip}, {"$limit": limit}],
+        }},
+    ]).to_list(length=1)
+    facet = result[0] if result else {"total": [], "page": []}
+    total = facet["total"][0]["count"] if facet["total"] else 0
+    return facet["page"], total
+
+
+################################################################################
+###################################검색 API######################################
+################################################################################
+
+class SearchResult(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    board: str  # 게시판 종류
+    number: Optional[int] = None  # 글 번호
+    title: str  # 제목
+    excerpt: str = ""  # 본문 미리보기
+    views: int = 0  # 조회수
+    score: int = 0  # 검색 점수
+    class Config:
+        allow_population_by_field_name = True
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult] = Field(..., description="검색 결과")
+    total: int = Field(..., description="전체 결과 수")
+    total_pages: int = Field(..., description="총 페이지 수")
+    current_page: int = Field(..., description="현재 페이지 번호")
+
+# 게시물 검색, board를 지정하지 않으면 전체 게시판 검색
+@router.get("", response_model=SearchResponse)
+async def search_posts(
+        q: str,
+        board: Optional[str] = None,
+        page: int = 1,
+        limit: int = 10,
+        db: AsyncIOMotorDatabase = Depends(get_db)
+    ):
+    if board is not None and board not in searchable_boards:
+        raise HTTPException(status_code=400, detail="Invalid type")
+    page = max(page, 1)
+    limit = min(max(limit, 1), MAX_LIMIT)
+
+    hits, total = await search_postings(db, q, [board] if board else searchable_boards, (page - 1) * limit, limit)
+
+    # 결과 게시물을 게시판별로 한 번씩 조회
+    ids_by_board: Dict[str, List[ObjectId]] = {}
+    for hit in hits:
+        ids_by_board.setdefault(hit["_id"]["b"], []).append(hit["_id"]["p"])
+    found = await asyncio.gather(*[
+        db[name].find({"_id": {"$in": ids}}, SUMMARY_PROJECTION).to_list(length=len(ids))
+        for name, ids in ids_by_board.items()
+    ])
+    posts = {(name, post["_id"]): post for name, board_posts in zip(ids_by_board, found) for post in board_posts}
+
+    results = []
+    for hit in hits:
+        post = posts.get((hit["_id"]["b"], hit["_id"]["p"]))
+        if post is None:  # 색인 갱신 전에 삭제된 게시물
+            continue
+        post["_id"] = str(post["_id"])
+        results.append({**post, "board": hit["_id"]["b"], "score": hit["score"]})
+
+    return {
+        "results": results,
+        "total": total,
+        "total_pages": (total + limit - 1) // limit,
+        "current_page": page
+    }
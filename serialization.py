@@ -0,0 +1,113 @@
+################################################################################
+###################################응답 직렬화###################################
+################################################################################
+# 빠른 JSON 응답 경로.
+# - orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 대체
+# - ObjectId, datetime 등 MongoDB(BSON) 값을 바로 변환
+# - TrustedRoute를 쓰는 라우터는 DB에서 읽은 문서를 response_model로 다시 검증하지 않는다.
+#   응답 모델의 최상위 필드만 골라 내보내므로 응답 형태는 같고, 검증/jsonable_encoder 비용이 없다.
+# 라우터별로 선택: router = APIRouter(route_class=TrustedRoute)
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import functools
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson은 선택 사항
+    orjson = None
+
+
+# 표준 JSON으로 표현할 수 없는 값 변환
+def bson_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text  # pydantic과 같은 UTC 표기
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True) if hasattr(value, "model_dump") else value.dict(by_alias=True)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=bson_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=bson_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# 응답 모델의 최상위 필드 (출력 이름, 필수 여부, 기본값)
+def model_keys(model: type) -> List[Tuple[str, bool, Any]]:
+    keys = []
+    fields = getattr(model, "model_fields", None)
+    if fields is not None:  # pydantic v2
+        for name, field in fields.items():
+            required = field.is_required()
+            keys.append((field.alias or name, required, None if required else field.get_default(call_default_factory=True)))
+    else:  # pydantic v1
+        for field in model.__fields__.values():
+            keys.append((field.alias, field.required, None if field.required else field.get_default()))
+    return keys
+
+
+# 응답 모델 형태로 최상위 키만 고른다 (없는 선택 필드는 기본값)
+def shape(content: Any, keys: Optional[List[Tuple[str, bool, Any]]]) -> Any:
+    if keys is None or not isinstance(content, dict):
+        return content
+    shaped = {}
+    for key, required, default in keys:
+        if key in content:
+            shaped[key] = content[key]
+        elif not required:
+            shaped[key] = default
+    return shaped
+
+
+def _trusted_endpoint(endpoint: Callable, response_model: Any, status_code: int) -> Callable:
+    if getattr(endpoint, "_trusted", False):  # include_router가 라우트를 다시 만들 때 중복 감싸지 않음
+        return endpoint
+    keys = model_keys(response_model) if isinstance(response_model, type) and issubclass(response_model, BaseModel) else None
+
+    @functools.wraps(endpoint)  # FastAPI가 원래 함수의 매개변수로 의존성을 해석하도록
+    async def wrapper(*args, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            content = await endpoint(*args, **kwargs)
+        else:
+            content = await run_in_threadpool(endpoint, *args, **kwargs)
+        if isinstance(content, Response):  # 304 등 직접 만든 응답
+            return content
+        # 핸들러가 주입받은 Response에 설정한 헤더/상태 코드 반영
+        sub_response = next((value for value in kwargs.values() if isinstance(value, Response)), None)
+        response = FastJSONResponse(
+            shape(content, keys),
+            status_code=(sub_response.status_code if sub_response is not None else None) or status_code
+        )
+        if sub_response is not None:
+            response.raw_headers.extend(header for header in sub_response.raw_headers if header[0] != b"content-length")
+        return response
+    wrapper._trusted = True
+    return wrapper
+
+
+# response_model은 문서(OpenAPI)에만 쓰고, 응답은 검증 없이 바로 직렬화하는 라우트
+class TrustedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = getattr(kwargs.get("response_model"), "value", kwargs.get("response_model"))  # Default(None) 처리
+        super().__init__(path, _trusted_endpoint(endpoint, response_model, kwargs.get("status_code") or 200), **kwargs)
@@ -0,0 +1,212 @@
+################################################################################
+###################################운영 서버#####################################
+################################################################################
+# 다중 워커 서버 실행: python serve.py (또는 python main.py)
+# - 감독 프로세스가 소켓을 한 번 열어두고 워커들이 같은 소켓에서 연결을 받는다
+# - 워커 수는 사용 가능한 CPU 수 (CPU affinity, cgroup 할당량 반영), WEB_CONCURRENCY로 지정 가능
+# - uvloop, httptools가 설치되어 있으면 사용
+# - 워커는 lifespan(연결 풀/캐시 예열)을 마친 뒤에만 연결을 받는다
+# - SIGHUP: 워커를 하나씩 새로 띄워 준비되면 기존 워커를 정상 종료 (새 코드 반영, 연결 끊김 없음)
+# - SIGTERM/SIGINT: 모든 워커 정상 종료 후 종료
+# 워커마다 메모리 캐시/지표가 따로이므로 SESSION_SECRET은 반드시 설정해야 한다 (없으면 워커 1개로만 실행 가능).
+
+from typing import List, Optional, Tuple
+import argparse
+import importlib.util
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import uvicorn
+
+logger = logging.getLogger("serve")
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))  # 수락 대기 연결 수 (커널 somaxconn 이하로 적용됨)
+KEEP_ALIVE = int(os.getenv("KEEP_ALIVE_TIMEOUT", "15"))  # 유휴 keep-alive 연결 유지 시간(초), 프록시보다 짧게
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))  # 종료 시 처리 중 요청을 기다리는 시간(초)
+STARTUP_TIMEOUT = float(os.getenv("WORKER_STARTUP_TIMEOUT", "60"))  # 워커 준비를 기다리는 시간(초)
+
+
+# 이 프로세스가 쓸 수 있는 CPU 수
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        cpus = os.cpu_count() or 1
+    try:  # 컨테이너 CPU 할당량 (cgroup v2)
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus()
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+# 워커에 넘길 uvicorn 설정
+def server_config(app: str) -> dict:
+    return {
+        "app": app,
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "timeout_keep_alive": KEEP_ALIVE,
+        "timeout_graceful_shutdown": GRACEFUL_TIMEOUT,
+        "backlog": BACKLOG,
+        "proxy_headers": True,
+        "server_header": False,
+        "log_level": os.getenv("LOG_LEVEL", "info"),
+    }
+
+
+# 모든 워커가 공유할 수신 소켓
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, ready):
+        super().__init__(config)
+        self.ready = ready
+
+    # lifespan 시작(연결 풀/캐시 예열)과 소켓 수신 시작이 끝나면 감독 프로세스에 알림
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            self.ready.set()
+
+
+def _run_worker(config: dict, sock: socket.socket, ready):
+    os.setpgrp()  # 터미널의 Ctrl+C는 감독 프로세스만 받고, 워커 종료는 감독 프로세스가 지시
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)  # 재시작은 감독 프로세스가 처리
+    WorkerServer(uvicorn.Config(**config), ready).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, config: dict, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.processes: List[multiprocessing.Process] = []
+        self.context = multiprocessing.get_context("spawn")  # 새 워커는 코드를 새로 import
+        self.should_exit = False
+        self.should_reload = False
+
+    def spawn(self) -> Tuple[multiprocessing.Process, object]:
+        ready = self.context.Event()
+        process = self.context.Process(target=_run_worker, args=(self.config, self.sock, ready), daemon=False)
+        process.start()
+        return process, ready
+
+    # 워커가 준비될 때까지 대기, 실패하면 정리 후 False
+    def wait_ready(self, process: multiprocessing.Process, ready) -> bool:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not ready.wait(0.2):
+            if not process.is_alive() or time.monotonic() > deadline or self.should_exit:
+                self.stop(process)
+                return False
+        return True
+
+    # 정상 종료 요청 후 대기, 시간이 지나면 강제 종료
+    # (uvicorn은 두 번째 SIGTERM을 받으면 바로 종료하므로 신호는 한 번만 보낸다)
+    def stop(self, process: multiprocessing.Process, signaled: bool = False):
+        if not signaled and process.is_alive():
+            process.terminate()  # SIGTERM: 새 연결을 받지 않고 처리 중 요청을 마침
+        process.join(GRACEFUL_TIMEOUT + 5)
+        if process.is_alive():
+            logger.warning("worker %d did not exit in time, killing", process.pid)
+            process.kill()
+            process.join()
+
+    def start(self) -> bool:
+        started = [self.spawn() for _ in range(self.workers)]  # 동시에 띄우고 모두 준비될 때까지 대기
+        for process, ready in started:
+            if self.wait_ready(process, ready):
+                self.processes.append(process)
+        logger.info("%d/%d workers ready on %s", len(self.processes), self.workers, self.sock.getsockname())
+        return bool(self.processes)
+
+    # 워커를 하나씩 교체: 새 워커가 준비된 뒤에 기존 워커를 종료하므로 항상 연결을 받는 워커가 있다
+    def rolling_restart(self):
+        logger.info("rolling restart of %d workers", len(self.processes))
+        for index, old in enumerate(list(self.processes)):
+            process, ready = self.spawn()
+            if not self.wait_ready(process, ready):
+                logger.error("new worker failed to start, keeping the remaining old workers")
+                return
+            self.processes[index] = process
+            self.stop(old)
+        logger.info("rolling restart complete")
+
+    # 비정상 종료된 워커 다시 띄우기
+    def replace_dead(self):
+        for index, process in enumerate(self.processes):
+            if not process.is_alive():
+                logger.warning("worker %d exited with code %s, restarting", process.pid, process.exitcode)
+                process, ready = self.spawn()
+                if self.wait_ready(process, ready):
+                    self.processes[index] = process
+
+    def handle_reload(self, signum, frame):
+        self.should_reload = True
+
+    def handle_exit(self, signum, frame):
+        self.should_exit = True
+
+    def run(self):
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        if not self.start():
+            logger.error("no worker started")
+            return
+        while not self.should_exit:
+            if self.should_reload:
+                self.should_reload = False
+                self.rolling_restart()
+            self.replace_dead()
+            time.sleep(0.5)
+        logger.info("shutting down %d workers", len(self.processes))
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()  # 모든 워커가 동시에 정리를 시작하도록 먼저 신호를 보냄
+        for process in self.processes:
+            self.stop(process, signaled=True)
+        self.sock.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers")
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=worker_count())
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [serve] %(message)s")
+    if args.workers > 1 and not os.getenv("SESSION_SECRET"):  # 워커마다 다른 임시 키로 서명하게 되므로 시작하지 않음
+        parser.error("SESSION_SECRET must be set to run more than one worker (or use --workers 1)")
+    config = server_config(args.app)
+    logger.info("starting %d workers (loop=%s, http=%s)", args.workers, config["loop"], config["http"])
+    Supervisor(config, bind_socket(args.host, args.port, BACKLOG), args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,103 @@
 # setup_db.py
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+# 기본 데이터 삽입, 데이터 이전, 인덱스 관리 (여러 번 실행해도 결과가 같다)
+#   python setup_db.py           : 전체 설정 실행
+#   python setup_db.py --reindex : 전체 설정 실행 + 검색 색인 새로 만들기 (토큰화 규칙이 바뀌었을 때)
+#   python setup_db.py --check   : 변경 없이 인덱스 상태만 확인
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, List
+import logging
+from database import connect_db, close_db, get_db
+from counters import rebuild_counters
+from main_business import types as main_business_types
+from notice import types as notice_types
+import cache
+import comments
+import counters
+import jobs
+import search
+import storage
 
-async def setup_db():
-    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/kustii"))
-    db = client["board"]
+logger = logging.getLogger(__name__)
 
+BOARDS = main_business_types + notice_types
+
+# 컬렉션별 인덱스 선언 (_id 인덱스는 기본으로 있으므로 제외)
+# 게시판 목록/피드/커서 이동은 _id 정렬만 사용한다.
+def _board_indexes() -> List[IndexModel]:
+    return [
+        IndexModel([("number", -1)]),  # 글 번호 발급/재계산 (counters.rebuild_counters)
+    ]
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    **{board: _board_indexes() for board in BOARDS},
+    # 미디어 게시물은 목록 API가 없고 조회/수정/삭제/썸네일 작업 모두 _id로만 찾는다
+    # (files.blob_id 조건은 setup_db의 backfill_content_types 한 번뿐이라 인덱스를 두지 않음)
+    "media": [],
+    # 댓글은 게시물/부모 단위와 스레드 경로로만 조회한다 (작성자별 조회 API는 없으므로 (board, user) 인덱스는 두지 않음)
+    comments.COLLECTION: [
+        IndexModel([("board", 1), ("post_id", 1), ("parent_id", 1), ("_id", 1)]),  # 게시물/부모별 작성순 목록
+        IndexModel([("path", 1)]),  # 하위 스레드 삭제 (접두사 검색)
+    ],
+    # 아래 컬렉션은 _id로만 조회 (선언해 두어 check_indexes가 선언하지 않은 인덱스를 알려 준다)
+    counters.COLLECTION: [],  # 게시판별 게시물 수/글 번호
+    storage.file_store.collection: [],  # 첨부 파일 blob (SHA-256)
+    storage.image_store.collection: [],  # 소개 페이지 이미지 blob
+    cache.VERSIONS_COLLECTION: [],  # 워커 간 캐시 버전
+    search.COLLECTION: [
+        IndexModel([("t", 1), ("w", -1)]),  # 용어별 가중치 순 후보 조회
+        IndexModel([("t", 1), ("p", 1)]),  # 후보 게시물 안에서 나머지 용어 확인
+        IndexModel([("b", 1), ("p", 1)]),  # 게시물 재색인/삭제
+    ],
+    search.TERMS_COLLECTION: [],  # 용어(_id)별 문서 빈도
+    jobs.COLLECTION: [
+        IndexModel([("status", 1), ("run_at", 1)]),  # 대기 작업 가져오기
+        IndexModel([("status", 1), ("locked_until", 1)]),  # 임대 시간이 지난 작업 가져오기
+        IndexModel([("finished_at", 1)], expireAfterSeconds=7 * 24 * 3600),  # 완료된 작업은 7일 뒤 삭제
+    ],
+}
+
+# 선언된 인덱스 생성 (이미 있으면 변화 없음)
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    for collection, indexes in INDEXES.items():
+        if indexes:
+            for index in indexes:
+                index.document.setdefault("background", True)  # 4.2 이전 서버에서 쓰기를 막지 않도록
+            await db[collection].create_indexes(indexes)
+
+# 인덱스 상태 확인: 선언했지만 없는 인덱스(missing), 선언하지 않은 인덱스(undeclared),
+# 서버 시작 이후 한 번도 쓰이지 않은 인덱스(unused, $indexStats 기준)
+async def check_indexes(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    report = {}
+    for collection, indexes in INDEXES.items():
+        declared = {index.document["name"] for index in indexes}
+        existing = {index["name"] async for index in db[collection].list_indexes()} - {"_id_"}
+        try:
+            stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(length=None)
+            unused = sorted(stat["name"] for stat in stats if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0)
+        except (OperationFailure, NotImplementedError):  # 권한이 없거나 지원하지 않는 서버
+            unused = []
+        result = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "unused": unused,
+        }
+        if any(result.values()):
+            report[collection] = result
+    return report
+
+# 애플리케이션 시작 시 실행 (인덱스를 만들지 않고 경고만 남김)
+async def log_index_report(db: AsyncIOMotorDatabase):
+    for collection, result in (await check_indexes(db)).items():
+        if result["missing"]:
+            logger.warning("%s: missing indexes %s (run setup_db.py)", collection, ", ".join(result["missing"]))
+        if result["undeclared"]:
+            logger.info("%s: undeclared indexes %s", collection, ", ".join(result["undeclared"]))
+        if result["unused"]:
+            logger.info("%s: unused indexes %s", collection, ", ".join(result["unused"]))
+
+async def setup_db(db: AsyncIOMotorDatabase, reindex: bool = False):
     # 인사말 게시판 기본 데이터 삽입
     hello = {
         "title": "인사말 게시판 제목",
@@ -39,7 +131,7 @@ async def setup_db():
         "title": "포럼 제목",
         "content": "포럼 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
     }
     await db["forum"].update_one({}, {"$setOnInsert": forum}, upsert=True)
@@ -48,7 +140,7 @@ async def setup_db():
         "title": "assist 제목",
         "content": "assist 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
     }
     await db["assist"].update_one({}, {"$setOnInsert": assist}, upsert=True)
@@ -57,7 +149,7 @@ async def setup_db():
         "title": "stemtraining 제목",
         "content": "stemtraining 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
     }
     await db["stemtraining"].update_one({}, {"$setOnInsert": stemtraining}, upsert=True)
@@ -66,7 +158,7 @@ async def setup_db():
         "title": "steducation 제목",
         "content": "steducation 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
     }
     await db["steducation"].update_one({}, {"$setOnInsert": steducation}, upsert=True)
@@ -75,7 +167,7 @@ async def setup_db():
         "title": "essay 제목",
         "content": "essay 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
     }
     await db["essay"].update_one({}, {"$setOnInsert": essay}, upsert=True)
@@ -84,7 +176,7 @@ async def setup_db():
         "title": "news 제목",
         "content": "news 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
         
     }
@@ -94,11 +186,45 @@ async def setup_db():
         "title": "notice 제목",
         "content": "notice 본문",
         "files": [],
-        "comments": [],
+        "comment_count": 0,
         "views": 0
     }
     await db["notice"].update_one({}, {"$setOnInsert": notice}, upsert=True)
 
+    # 선언된 인덱스 생성 (INDEXES)
+    await ensure_indexes(db)
+
+    # 게시물 문서에 포함되어 있던 댓글을 comments 컬렉션으로 이전
+    await comments.migrate_embedded_comments(db, BOARDS)
+
+    # 첨부 파일 형식 기록 (다운로드 Content-Type)
+    await storage.backfill_content_types(db, BOARDS + ["media"])
+
+    # 기존 게시물 재색인: 요청했거나 색인이 아직 없을 때만 (새 색인을 다 만든 뒤 교체)
+    if reindex or await search.index_is_empty(db):
+        await search.rebuild_index(db, BOARDS, INDEXES)
+
+    # 게시판 카운터(게시물 수, 글 번호)를 기존 데이터 기준으로 재계산
+    await rebuild_counters(db, BOARDS)
+
+async def main(check_only: bool = False, reindex: bool = False):
+    # 애플리케이션과 같은 연결 설정(database.py)을 사용
+    await connect_db()
+    try:
+        if check_only:
+            report = await check_indexes(get_db())
+            for collection, result in report.items():
+                for kind, names in result.items():
+                    if names:
+                        print(f"{collection}: {kind} {', '.join(names)}")
+            if not report:
+                print("All declared indexes exist")
+        else:
+            await setup_db(get_db(), reindex=reindex)
+    finally:
+        close_db()
+
 if __name__ == "__main__":
     import asyncio
-    asyncio.run(setup_db())
+    import sys
+    asyncio.run(main(check_only="--check" in sys.argv[1:], reindex="--reindex" in sys.argv[1:]))
@@ -0,0 +1,117 @@
+################################################################################
+#############################내용 주소 기반 첨부 저장소############################
+################################################################################
+# 첨부 파일을 SHA-256 값으로 저장해 같은 내용은 한 번만 디스크에 둔다.
+#   files/ab/cd/abcd... (하위 디렉터리 2단계로 분산)
+# 참조 수는 MongoDB 컬렉션에서 관리한다.
+#   { "_id": "<sha256>", "refs": 2, "path": "files/ab/cd/<sha256>", "size": 1234, "content_type": "image/png" }
+# 게시물에는 blob_id와 원본 파일 이름을 담은 첨부 정보가 저장된다.
+
+from fastapi import UploadFile
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from typing import List, Optional
+import asyncio
+import mimetypes
+import os
+import uuid
+from uploads import CheckedUpload, check_uploads, place_upload
+
+
+# 게시물에 저장되는 첨부 정보
+class Attachment(BaseModel):
+    blob_id: str  # 내용의 SHA-256
+    filename: str  # 원본 파일 이름
+    path: str  # 저장 경로 (내용이 같으면 항상 같은 경로)
+    size: int = 0  # 바이트 수
+
+
+# 처음 올린 파일 이름으로 정한 형식 (다운로드 시 Content-Type, 요청의 ?name=은 믿지 않음)
+def content_type(filename: Optional[str]) -> str:
+    return mimetypes.guess_type(filename or "")[0] or "application/octet-stream"
+
+
+class BlobStore:
+    def __init__(self, root: str, collection: str):
+        self.root = root
+        self.collection = collection
+
+    def blob_path(self, blob_id: str) -> str:
+        return f"{self.root}/{blob_id[:2]}/{blob_id[2:4]}/{blob_id}"
+
+    # 검증된 업로드 파일을 저장소에 등록하고 참조 수를 1 늘린다
+    async def put(self, db: AsyncIOMotorDatabase, upload: CheckedUpload) -> dict:
+        blob_id = upload.sha256
+        path = self.blob_path(blob_id)
+        # 참조 수를 먼저 올려서 동시에 진행 중인 release가 파일을 지우지 못하게 한다
+        await db[self.collection].update_one(
+            {"_id": blob_id},
+            {"$inc": {"refs": 1}, "$setOnInsert": {"path": path, "size": upload.size, "content_type": content_type(upload.filename)}},
+            upsert=True
+        )
+        if not os.path.exists(path):  # 같은 내용이 이미 있으면 디스크에 쓰지 않음
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            await place_upload(upload, path)
+        return {"blob_id": blob_id, "filename": upload.filename, "path": path, "size": upload.size}
+
+    # 업로드 파일들을 동시에 저장하고 첨부 정보 목록을 반환
+    # 하나라도 실패하면 나머지 파일의 참조를 해제하고 첫 오류를 다시 올린다
+    async def put_uploads(self, db: AsyncIOMotorDatabase, files: List[UploadFile]) -> List[dict]:
+        uploads = await check_uploads(files)
+        results = await asyncio.gather(*(self.put(db, upload) for upload in uploads), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.release_all(db, [result["blob_id"] for result in results if not isinstance(result, BaseException)])
+            raise errors[0]
+        return list(results)
+
+    # 참조 하나를 해제하고, 더 이상 참조가 없으면 파일을 삭제 (삭제했으면 True)
+    async def release(self, db: AsyncIOMotorDatabase, blob_id: str) -> bool:
+        blob = await db[self.collection].find_one_and_update(
+            {"_id": blob_id},
+            {"$inc": {"refs": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob is None or blob["refs"] > 0:
+            return False
+
+        # 파일을 먼저 옮겨 두고, 그 사이 put이 참조를 올리지 않았을 때만 실제로 삭제
+        path = self.blob_path(blob_id)
+        trash = f"{path}.{uuid.uuid4().hex}.deleting"
+        try:
+            os.replace(path, trash)
+        except FileNotFoundError:
+            trash = None
+        result = await db[self.collection].delete_one({"_id": blob_id, "refs": {"$lte": 0}})
+        if trash is not None:
+            if result.deleted_count or os.path.exists(path):
+                os.remove(trash)
+            else:
+                os.replace(trash, path)  # 그 사이 다시 참조됨: 되돌림
+        return bool(result.deleted_count)
+
+    async def release_all(self, db: AsyncIOMotorDatabase, blob_ids: List[str]):
+        for blob_id in blob_ids:
+            await self.release(db, blob_id)
+
+
+# 형식이 기록되지 않은 기존 blob에 게시물 첨부의 원본 파일 이름으로 Content-Type 기록 (setup_db에서 실행)
+async def backfill_content_types(db: AsyncIOMotorDatabase, collections: List[str]):
+    for collection in collections:
+        async for post in db[collection].find({"files.blob_id": {"$exists": True}}, {"files": 1}):
+            for file in post.get("files") or []:
+                if isinstance(file, dict) and "blob_id" in file:
+                    await db[file_store.collection].update_one(
+                        {"_id": file["blob_id"], "content_type": {"$exists": False}},
+                        {"$set": {"content_type": content_type(file.get("filename"))}}
+                    )
+
+
+# 첨부 목록에서 blob_id만 추출 (경로 문자열만 있는 기존 게시물은 제외)
+def blob_ids(files: Optional[list]) -> List[str]:
+    return [file["blob_id"] for file in files or [] if isinstance(file, dict) and "blob_id" in file]
+
+
+file_store = BlobStore("files", "blobs")  # 게시판/미디어 첨부 파일
+image_store = BlobStore("images", "image_blobs")  # 소개 페이지 이미지
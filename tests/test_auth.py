@@ -0,0 +1,52 @@
+# auth.issue_token / verify_token 확인
+# 발급한 토큰이 검증되는지, 만료/서명 변조/내용 변조/다른 키로 서명한 토큰/없는 계정은 거부되는지 확인한다.
+#   python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SESSION_SECRET", "test-secret")
+import auth
+from auth import _b64decode, _b64encode, issue_token, verify_token
+
+
+class TokenTest(unittest.TestCase):
+    def test_valid_token(self):
+        self.assertEqual(verify_token(issue_token("superadmin")), "superadmin")
+
+    def test_expired_token(self):
+        self.assertIsNone(verify_token(issue_token("superadmin", ttl=-1)))
+
+    def test_tampered_signature(self):
+        payload, _, signature = issue_token("admin").partition(".")
+        forged = signature[:-1] + ("A" if signature[-1] != "A" else "B")
+        self.assertIsNone(verify_token(f"{payload}.{forged}"))
+
+    def test_tampered_payload(self):  # 만료 시간을 늘리거나 계정을 바꾼 내용은 원래 서명과 맞지 않음
+        payload, _, signature = issue_token("admin").partition(".")
+        claims = _b64decode(payload).replace(b'"admin"', b'"superadmin"')
+        self.assertIsNone(verify_token(f"{_b64encode(claims)}.{signature}"))
+
+    def test_token_signed_with_other_secret(self):
+        token = issue_token("superadmin")
+        secret = auth.SESSION_SECRET
+        auth.SESSION_SECRET = "another-worker-secret"
+        try:
+            self.assertIsNone(verify_token(token))
+        finally:
+            auth.SESSION_SECRET = secret
+
+    def test_unknown_account(self):
+        self.assertIsNone(verify_token(issue_token("guest")))
+
+    def test_malformed_tokens(self):
+        not_json = _b64encode(b"not json")
+        for token in ("", "no-signature", ".", "abc.def", f"{not_json}.{auth._sign(not_json)}"):
+            with self.subTest(token=token):
+                self.assertIsNone(verify_token(token))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# bulk 일괄 가져오기의 NDJSON 줄 나누기와 항목별 결과 확인
+# 청크 경계에 걸친 줄, 너무 긴 줄, 너무 큰 본문을 나누는 방식과
+# insert_many만 흉내 낸 메모리 컬렉션으로 줄마다 돌려주는 결과(생성/검증 오류/쓰기 오류)를 확인한다.
+#   python -m unittest discover tests
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bson import ObjectId
+from pydantic import BaseModel
+from pymongo.errors import AutoReconnect, BulkWriteError
+import bulk
+
+
+class PostImport(BaseModel):
+    title: str
+
+
+class MemoryBoard:
+    def __init__(self):
+        self.docs = []
+        self.failing_titles = set()  # 쓰기 오류를 낼 게시물 제목
+        self.error = None  # insert_many 전체가 던질 예외
+
+    async def insert_many(self, docs, ordered=True):
+        if self.error is not None:
+            raise self.error
+        write_errors = []
+        for index, doc in enumerate(docs):
+            doc.setdefault("_id", ObjectId())
+            if doc["title"] in self.failing_titles:
+                write_errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            else:
+                self.docs.append(doc)
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "nInserted": len(docs) - len(write_errors)})
+
+
+class MemoryDatabase(dict):
+    def __missing__(self, name):
+        self[name] = MemoryBoard()
+        return self[name]
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def collect(stream):
+    return [line async for line in bulk._lines(stream)]
+
+
+class LinesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_lines_across_chunks(self):
+        lines = await collect(chunks(b'{"a"', b':1}\n{"b":2}\n{', b'"c":3}'))
+        self.assertEqual(lines, [b'{"a":1}', b'{"b":2}', b'{"c":3}'])
+
+    async def test_blank_and_trailing_newlines(self):
+        self.assertEqual(await collect(chunks(b"a\n\nb\n")), [b"a", b"", b"b"])
+
+    async def test_long_line_is_skipped(self):
+        with mock.patch.object(bulk, "MAX_LINE_SIZE", 8):
+            lines = await collect(chunks(b"short\n" + b"x" * 6, b"x" * 6, b"x\nok\n", b"y" * 9))
+        self.assertEqual(lines, [b"short", None, b"ok", None])
+
+    async def test_line_at_limit_is_kept(self):
+        with mock.patch.object(bulk, "MAX_LINE_SIZE", 8):
+            self.assertEqual(await collect(chunks(b"12345678\n")), [b"12345678"])
+
+    async def test_body_limit(self):
+        with mock.patch.object(bulk, "MAX_IMPORT_SIZE", 10):
+            with self.assertRaises(bulk._BodyTooLarge):
+                await collect(chunks(b"abc\n", b"defg\n", b"hij\n"))
+
+
+class ImportPostsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db = MemoryDatabase()
+
+    async def run_import(self, *parts: bytes, numbered: bool = False, after_insert=None):
+        return await bulk.import_posts(self.db, "forum", chunks(*parts), PostImport, {"views": 0}, numbered, after_insert)
+
+    def statuses(self, summary):
+        return [(result["index"], result["status"], result["detail"]) for result in summary["results"]]
+
+    async def test_results_per_line(self):
+        inserted = []
+
+        async def after_insert(db, board, posts):
+            inserted.extend(post["title"] for post in posts)
+
+        summary = await self.run_import(
+            b'{"title": "a"}\n', b'not json\n', b'\n', b'[1, 2]\n', b'{"body": "x"}\n', b'{"title": "b"}',
+            after_insert=after_insert,
+        )
+        statuses = self.statuses(summary)
+        self.assertEqual([status[:2] for status in statuses], [
+            (1, "created"), (2, "error"), (4, "error"), (5, "error"), (6, "created"),
+        ])
+        self.assertEqual(statuses[1][2], "Invalid JSON")
+        self.assertEqual(statuses[2][2], "Each line must be a JSON object")
+        self.assertIn("title", statuses[3][2])
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 3))
+        self.assertEqual(inserted, ["a", "b"])
+        self.assertEqual(self.db["forum"].docs[0]["views"], 0)  # defaults 적용
+        self.assertEqual(summary["results"][0]["_id"], str(self.db["forum"].docs[0]["_id"]))
+
+    async def test_batches_keep_line_numbers(self):
+        with mock.patch.object(bulk, "IMPORT_BATCH_SIZE", 2):
+            summary = await self.run_import(b"".join(b'{"title": "%d"}\n' % number for number in range(5)))
+        self.assertEqual([status[:2] for status in self.statuses(summary)], [(number, "created") for number in range(1, 6)])
+
+    async def test_write_errors_and_numbering(self):
+        self.db["forum"].failing_titles.add("dup")
+        with mock.patch.object(bulk, "reserve_post_numbers", mock.AsyncMock(return_value=10)), \
+                mock.patch.object(bulk, "decrement_post_count", mock.AsyncMock()) as decrement:
+            summary = await self.run_import(b'{"title": "a"}\n{"title": "dup"}\n{"title": "c"}\n', numbered=True)
+        self.assertEqual(self.statuses(summary), [(1, "created", None), (2, "error", "duplicate key"), (3, "created", None)])
+        self.assertEqual([doc["number"] for doc in self.db["forum"].docs], [10, 12])  # 실패한 번호는 비워 둔다
+        decrement.assert_awaited_once_with(self.db, "forum", 1)
+
+    async def test_database_error_fails_whole_batch(self):
+        self.db["forum"].error = AutoReconnect("connection lost")
+        with mock.patch.object(bulk, "reserve_post_numbers", mock.AsyncMock(return_value=1)), \
+                mock.patch.object(bulk, "decrement_post_count", mock.AsyncMock()) as decrement:
+            summary = await self.run_import(b'{"title": "a"}\n{"title": "b"}\n', numbered=True)
+        self.assertEqual(self.statuses(summary), [(1, "error", "Database error"), (2, "error", "Database error")])
+        decrement.assert_awaited_once_with(self.db, "forum", 2)
+
+    async def test_size_limits(self):
+        with mock.patch.object(bulk, "MAX_LINE_SIZE", 20), mock.patch.object(bulk, "MAX_IMPORT_SIZE", 80):
+            summary = await self.run_import(
+                b'{"title": "a"}\n', b'{"title": "' + b"x" * 30 + b'"}\n', b'{"title": "b"}\n', b'{"title": "c"}\n',
+            )
+        statuses = self.statuses(summary)
+        self.assertEqual([status[:2] for status in statuses], [(1, "created"), (2, "error"), (3, "created"), (4, "error")])
+        self.assertIn("Line too long", statuses[1][2])
+        self.assertIn("Request body too large", statuses[3][2])
+        self.assertEqual([doc["title"] for doc in self.db["forum"].docs], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# compression.choose_encoding과 ETag 접미사 처리 확인
+# CompressionMiddleware를 ETag로 304를 돌려주는 작은 ASGI 앱에 씌워,
+# If-None-Match의 -br/-gzip이 떼어져 앱에 전달되고 응답 ETag에는 다시 붙는지 확인한다.
+#   python -m unittest discover tests
+
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import compression
+from compression import CompressionMiddleware, choose_encoding
+
+ETAG = b'"abc123"'
+BODY = json.dumps({"items": ["x" * 50] * 100}).encode()
+
+
+class ChooseEncodingTest(unittest.TestCase):
+    def test_without_brotli(self):
+        with mock.patch.object(compression, "brotli", None):
+            self.assertEqual(choose_encoding("gzip, deflate, br"), "gzip")
+            self.assertIsNone(choose_encoding("br"))
+            self.assertIsNone(choose_encoding("identity"))
+
+    def test_prefers_brotli_on_equal_weight(self):
+        with mock.patch.object(compression, "brotli", object()):
+            self.assertEqual(choose_encoding("gzip, br"), "br")
+            self.assertEqual(choose_encoding("*"), "br")
+
+    def test_weights(self):
+        with mock.patch.object(compression, "brotli", object()):
+            self.assertEqual(choose_encoding("br;q=0.5, gzip;q=0.8"), "gzip")
+            self.assertEqual(choose_encoding("br;q=0, gzip"), "gzip")
+            self.assertEqual(choose_encoding("*;q=0.1, br;q=0"), "gzip")
+            self.assertIsNone(choose_encoding("gzip;q=0, br;q=0"))
+            self.assertEqual(choose_encoding("gzip;q=abc, br;q=0.1"), "br")  # 잘못된 가중치는 0
+
+
+class EtagSuffixTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.seen = []  # 앱이 받은 If-None-Match
+
+        async def app(scope, receive, send):
+            if_none_match = dict(scope["headers"]).get(b"if-none-match")
+            self.seen.append(if_none_match)
+            if if_none_match == ETAG:
+                await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", ETAG)]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode()), (b"etag", ETAG),
+            ]})
+            await send({"type": "http.response.body", "body": BODY})
+
+        self.middleware = CompressionMiddleware(app)
+        compression.compressed_cache.clear()
+
+    async def request(self, headers: dict):
+        scope = {
+            "type": "http", "method": "GET", "path": "/feed", "query_string": b"",
+            "headers": [(key.encode(), value.encode()) for key, value in headers.items()],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        await self.middleware(scope, receive, send)
+        return messages[0]["status"], dict(messages[0]["headers"]), scope
+
+    async def test_compressed_etag_gets_suffix(self):
+        status, headers, _ = await self.request({"accept-encoding": "gzip"})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(headers[b"etag"], b'"abc123-gzip"')
+
+    async def test_suffix_is_stripped_for_the_app(self):
+        status, headers, scope = await self.request({"accept-encoding": "gzip", "if-none-match": '"abc123-gzip"'})
+        self.assertEqual(self.seen, [ETAG])
+        self.assertEqual(status, 304)
+        self.assertEqual(headers[b"etag"], b'"abc123-gzip"')  # 304에도 클라이언트가 가진 ETag 그대로
+        self.assertIn((b"if-none-match", ETAG), scope["headers"])  # scope는 복사하지 않고 고친다
+
+    async def test_suffix_is_stripped_without_accept_encoding(self):
+        status, headers, _ = await self.request({"if-none-match": '"abc123-br"'})
+        self.assertEqual((self.seen, status), ([ETAG], 304))
+        self.assertEqual(headers[b"etag"], b'"abc123-br"')
+
+    async def test_multiple_etags(self):
+        await self.request({"if-none-match": '"old-gzip", "abc123-gzip"'})
+        self.assertEqual(self.seen, [b'"old", "abc123"'])
+
+    async def test_plain_etag_is_untouched(self):
+        status, headers, _ = await self.request({"if-none-match": '"abc123"'})
+        self.assertEqual((self.seen, status), ([ETAG], 304))
+        self.assertEqual(headers[b"etag"], ETAG)
+
+    async def test_hyphen_inside_etag_is_kept(self):
+        await self.request({"if-none-match": '"abc-123"'})
+        self.assertEqual(self.seen, [b'"abc-123"'])
+
+
+if __name__ == "__main__":
+    unittest.main()
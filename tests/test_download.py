@@ -0,0 +1,100 @@
+# download.parse_range와 If-Range 처리 확인
+# 임시 디렉터리의 파일로 file_response를 호출해 Range/If-Range 조합에 따라
+# 206 부분 응답과 200 전체 응답이 나뉘는지 확인한다.
+#   python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import HTTPException
+from starlette.requests import Request
+from download import file_response, parse_range
+from storage import BlobStore
+
+SIZE = 1000
+
+
+def make_request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/files/report.txt",
+        "query_string": b"",
+        "headers": [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()],
+    })
+
+
+class ParseRangeTest(unittest.TestCase):
+    def test_no_range(self):
+        self.assertIsNone(parse_range(None, SIZE))
+        self.assertIsNone(parse_range("", SIZE))
+
+    def test_closed_range(self):
+        self.assertEqual(parse_range("bytes=0-99", SIZE), (0, 99))
+
+    def test_open_range(self):
+        self.assertEqual(parse_range("bytes=900-", SIZE), (900, SIZE - 1))
+
+    def test_end_past_size_is_clamped(self):
+        self.assertEqual(parse_range("bytes=500-5000", SIZE), (500, SIZE - 1))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range("bytes=-100", SIZE), (900, SIZE - 1))
+        self.assertEqual(parse_range("bytes=-5000", SIZE), (0, SIZE - 1))
+
+    def test_ignored_ranges(self):  # 여러 범위, 다른 단위, 잘못된 숫자는 전체 응답
+        self.assertIsNone(parse_range("bytes=0-1,5-6", SIZE))
+        self.assertIsNone(parse_range("items=0-1", SIZE))
+        self.assertIsNone(parse_range("bytes=a-b", SIZE))
+
+    def test_unsatisfiable_ranges(self):
+        for header in ("bytes=1000-", "bytes=500-100", "bytes=-0"):
+            with self.subTest(header=header):
+                with self.assertRaises(HTTPException) as raised:
+                    parse_range(header, SIZE)
+                self.assertEqual(raised.exception.status_code, 416)
+                self.assertEqual(raised.exception.headers["Content-Range"], f"bytes */{SIZE}")
+
+
+class IfRangeTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.root.name, "report.txt"), "wb") as file:
+            file.write(b"x" * SIZE)
+        self.store = BlobStore(self.root.name, "blobs")
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    async def respond(self, headers: dict):
+        # 내용 기반 경로가 아니므로 Content-Type은 확장자로 정해지고 DB를 쓰지 않는다
+        return await file_response(make_request(headers), None, self.store, "report.txt", None)
+
+    async def test_range_without_if_range(self):
+        response = await self.respond({"Range": "bytes=0-9"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual((response.start, response.length), (0, 10))
+        self.assertEqual(response.headers["content-range"], f"bytes 0-9/{SIZE}")
+
+    async def test_matching_if_range(self):
+        etag = (await self.respond({})).headers["etag"]
+        response = await self.respond({"Range": "bytes=10-19", "If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual((response.start, response.length), (10, 10))
+
+    async def test_stale_if_range_sends_whole_file(self):
+        response = await self.respond({"Range": "bytes=10-19", "If-Range": '"old-version"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.start, response.length), (0, SIZE))
+        self.assertNotIn("content-range", response.headers)
+
+    async def test_stale_if_range_skips_unsatisfiable_range(self):  # 전체를 보내므로 416도 아님
+        response = await self.respond({"Range": "bytes=5000-", "If-Range": '"old-version"'})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
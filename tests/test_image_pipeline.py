@@ -0,0 +1,113 @@
+# image_pipeline.fetch_image 제한 확인
+# 표준 라이브러리 http.server를 스레드로 띄워 너무 큰 본문, 느린 응답, 이미지가 아닌 형식을 보내고
+# 각각 ImageFetchError로 거부되는지 확인한다.
+#   python -m unittest discover tests
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import image_pipeline
+from image_pipeline import ImageFetchError, fetch_image
+
+MAX_BYTES = 1024
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, content_type: str, body: bytes, length: bool = True):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if length:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/image.png":
+            self.send_body("image/png", PNG_BYTES)
+        elif self.path == "/large-declared.png":  # Content-Length로 알 수 있는 큰 본문
+            self.send_body("image/png", b"\x00" * (MAX_BYTES * 4))
+        elif self.path == "/large-chunked.png":  # 길이 없이 보내다가 제한을 넘는 본문
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for _ in range(8):
+                self.wfile.write(b"\x00" * MAX_BYTES)
+        elif self.path == "/slow.png":  # 읽기 제한 시간보다 짧은 간격으로 조금씩 보내는 응답
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            try:
+                for _ in range(100):
+                    self.wfile.write(b"\x00")
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        elif self.path == "/page.html":
+            self.send_body("text/html; charset=utf-8", b"<html></html>")
+        else:
+            self.send_error(404)
+
+
+class FetchImageTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.limits = (image_pipeline.MAX_IMAGE_BYTES, image_pipeline.FETCH_DEADLINE)
+        image_pipeline.MAX_IMAGE_BYTES = MAX_BYTES
+        image_pipeline.FETCH_DEADLINE = 1.0
+
+    async def asyncTearDown(self):
+        await image_pipeline.close_image_pipeline()  # 클라이언트는 테스트마다 다른 이벤트 루프에서 만들어진다
+        image_pipeline.MAX_IMAGE_BYTES, image_pipeline.FETCH_DEADLINE = self.limits
+
+    async def test_accepts_image(self):
+        self.assertEqual(await fetch_image(f"{self.base_url}/image.png"), PNG_BYTES)
+
+    async def test_rejects_declared_oversized_body(self):
+        with self.assertRaisesRegex(ImageFetchError, "too large"):
+            await fetch_image(f"{self.base_url}/large-declared.png")
+
+    async def test_rejects_oversized_body_without_length(self):
+        with self.assertRaisesRegex(ImageFetchError, "too large"):
+            await fetch_image(f"{self.base_url}/large-chunked.png")
+
+    async def test_rejects_slow_response(self):
+        started = time.monotonic()
+        with self.assertRaisesRegex(ImageFetchError, "timed out"):
+            await fetch_image(f"{self.base_url}/slow.png")
+        self.assertLess(time.monotonic() - started, 5)
+
+    async def test_rejects_non_image_content_type(self):
+        with self.assertRaisesRegex(ImageFetchError, "Not an image"):
+            await fetch_image(f"{self.base_url}/page.html")
+
+    async def test_rejects_error_status(self):
+        with self.assertRaisesRegex(ImageFetchError, "failed"):
+            await fetch_image(f"{self.base_url}/missing.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
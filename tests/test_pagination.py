@@ -0,0 +1,124 @@
+# pagination 커서 인코딩/디코딩과 커서 기준 페이지 이동 확인
+# fetch_page가 쓰는 find/sort/skip/limit만 흉내 낸 메모리 컬렉션으로
+# 커서를 따라간 결과와 커서에서 다른 페이지로 건너뛴 결과가 skip 조회와 같은지 확인한다.
+#   python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bson import ObjectId
+from fastapi import HTTPException
+from pagination import NEXT, PREV, decode_cursor, encode_cursor, fetch_page
+
+LIMIT = 3
+
+
+class MemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.offset = 0
+        self.count = None
+
+    def sort(self, key, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def skip(self, offset):
+        self.offset = offset
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    async def to_list(self, length):
+        return self.docs[self.offset:self.offset + min(self.count or length, length)]
+
+
+class MemoryCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        bounds = query.get("_id", {})
+        docs = [
+            doc for doc in self.docs
+            if ("$lt" not in bounds or doc["_id"] < bounds["$lt"]) and ("$gt" not in bounds or doc["_id"] > bounds["$gt"])
+        ]
+        return MemoryCursor(docs)
+
+
+class CursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        anchor = ObjectId()
+        for direction in (NEXT, PREV):
+            with self.subTest(direction=direction):
+                self.assertEqual(decode_cursor(encode_cursor(anchor, 4, direction)), (anchor, 4, direction))
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(ObjectId(), 12345, NEXT)
+        self.assertNotRegex(cursor, r"[+/=]")
+
+    def test_page_is_at_least_one(self):
+        self.assertEqual(decode_cursor(encode_cursor(ObjectId(), 0, PREV))[1], 1)
+
+    def test_invalid_cursors(self):
+        bad = encode_cursor(ObjectId(), 2, NEXT)[:-4]
+        for cursor in ("not-a-cursor", bad, encode_cursor(ObjectId(), 2, "sideways")):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(HTTPException) as raised:
+                    decode_cursor(cursor)
+                self.assertEqual(raised.exception.status_code, 400)
+
+
+class FetchPageTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.ids = sorted(ObjectId() for _ in range(10))  # 작성순
+        self.collection = MemoryCollection([{"_id": post_id} for post_id in self.ids])
+        self.newest_first = list(reversed(self.ids))
+
+    def expected(self, page: int):
+        return self.newest_first[(page - 1) * LIMIT:page * LIMIT]
+
+    async def page_ids(self, **kwargs):
+        docs, page, next_cursor, prev_cursor = await fetch_page(self.collection, limit=LIMIT, **kwargs)
+        return [doc["_id"] for doc in docs], page, next_cursor, prev_cursor
+
+    async def test_follow_next_and_prev_cursors(self):
+        ids, page, next_cursor, prev_cursor = await self.page_ids()
+        self.assertEqual((ids, page, prev_cursor), (self.expected(1), 1, None))
+        for expected_page in (2, 3, 4):
+            ids, page, next_cursor, prev_cursor = await self.page_ids(cursor=next_cursor)
+            self.assertEqual((ids, page), (self.expected(expected_page), expected_page))
+        self.assertIsNone(next_cursor)  # 마지막 페이지
+        ids, page, _, _ = await self.page_ids(cursor=prev_cursor)
+        self.assertEqual((ids, page), (self.expected(3), 3))
+
+    async def test_jump_forward_from_next_cursor(self):
+        _, _, next_cursor, _ = await self.page_ids()  # 2페이지로 가는 커서
+        ids, page, _, prev_cursor = await self.page_ids(cursor=next_cursor, page=4)
+        self.assertEqual((ids, page), (self.expected(4), 4))
+        ids, page, _, _ = await self.page_ids(cursor=prev_cursor)
+        self.assertEqual((ids, page), (self.expected(3), 3))
+
+    async def test_jump_back_from_prev_cursor(self):
+        _, _, _, prev_cursor = await self.page_ids(page=4)  # 3페이지로 가는 커서
+        ids, page, _, _ = await self.page_ids(cursor=prev_cursor, page=1)
+        self.assertEqual((ids, page), (self.expected(1), 1))
+
+    async def test_jump_against_cursor_direction(self):  # 커서 반대쪽은 처음부터 skip
+        _, _, next_cursor, _ = await self.page_ids(page=3)  # 4페이지로 가는 커서
+        ids, page, _, _ = await self.page_ids(cursor=next_cursor, page=2)
+        self.assertEqual((ids, page), (self.expected(2), 2))
+
+    async def test_page_without_cursor(self):
+        ids, page, next_cursor, prev_cursor = await self.page_ids(page=2)
+        self.assertEqual((ids, page), (self.expected(2), 2))
+        self.assertIsNotNone(next_cursor)
+        self.assertIsNotNone(prev_cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# view_counter.ViewCountBuffer 증가량 합산과 pending 계산 확인
+# bulk_write만 흉내 낸 메모리 DB로 반영 도중/반영 후/반영 실패 시
+# pending()이 DB에 아직 없는 증가량만 정확히 돌려주는지 확인한다.
+#   python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bson import ObjectId
+from view_counter import ViewCountBuffer
+
+
+class MemoryBoard:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.db.during_write is not None:
+            self.db.during_write(self.name)
+        if self.name in self.db.failing:
+            raise ConnectionError("connection lost")
+        for operation in operations:
+            post_id = operation._filter["_id"]
+            self.db.views[(self.name, post_id)] = self.db.views.get((self.name, post_id), 0) + operation._doc["$inc"]["views"]
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.views = {}  # (게시판, 게시물) -> 저장된 조회수
+        self.failing = set()
+        self.during_write = None
+
+    def __getitem__(self, name):
+        return MemoryBoard(self, name)
+
+
+class ViewCountBufferTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db = MemoryDatabase()
+        self.buffer = ViewCountBuffer(max_pending=100)
+        self.post = ObjectId()
+        self.other = ObjectId()
+
+    def total(self, board, post_id):  # 읽기 API가 보여주는 값: 저장된 조회수 + 반영 대기 중인 증가량
+        return self.db.views.get((board, post_id), 0) + self.buffer.pending(board, post_id)
+
+    async def test_adds_are_merged_per_post(self):
+        self.buffer.add("forum", self.post)
+        self.buffer.add("forum", self.post, 2)
+        self.buffer.add("news", self.post)
+        self.assertEqual(self.buffer.pending("forum", self.post), 3)
+        self.assertEqual(self.buffer.pending("news", self.post), 1)
+        self.assertEqual(self.buffer.pending("forum", self.other), 0)
+
+    async def test_flush_moves_counts_to_database(self):
+        self.buffer.add("forum", self.post, 3)
+        await self.buffer.flush(self.db)
+        self.assertEqual(self.db.views[("forum", self.post)], 3)
+        self.assertEqual(self.buffer.pending("forum", self.post), 0)
+
+    async def test_totals_are_stable_while_flushing(self):
+        self.buffer.add("forum", self.post, 3)
+        self.buffer.add("news", self.other, 2)
+        seen = []
+        self.db.during_write = lambda board: seen.append((self.total("forum", self.post), self.total("news", self.other)))
+        await self.buffer.flush(self.db)
+        self.assertEqual(seen, [(3, 2), (3, 2)])  # 먼저 반영된 게시판도 이중으로 세지 않음
+        self.assertEqual((self.total("forum", self.post), self.total("news", self.other)), (3, 2))
+
+    async def test_views_added_during_flush_wait_for_next_flush(self):
+        self.buffer.add("forum", self.post, 3)
+        self.db.during_write = lambda board: self.buffer.add("forum", self.post)
+        await self.buffer.flush(self.db)
+        self.db.during_write = None
+        self.assertEqual(self.buffer.pending("forum", self.post), 1)
+        self.assertEqual(self.total("forum", self.post), 4)
+        await self.buffer.flush(self.db)
+        self.assertEqual((self.db.views[("forum", self.post)], self.buffer.pending("forum", self.post)), (4, 0))
+
+    async def test_failed_board_is_retried(self):
+        self.buffer.add("forum", self.post, 3)
+        self.buffer.add("news", self.other, 2)
+        self.db.failing.add("news")
+        with self.assertLogs("view_counter", "ERROR"):
+            await self.buffer.flush(self.db)
+        self.assertEqual(self.buffer.pending("forum", self.post), 0)
+        self.assertEqual(self.buffer.pending("news", self.other), 2)  # 다음 주기로 넘어감
+        self.assertEqual(self.total("news", self.other), 2)
+        self.db.failing.clear()
+        await self.buffer.flush(self.db)
+        self.assertEqual((self.db.views[("news", self.other)], self.buffer.pending("news", self.other)), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
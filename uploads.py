@@ -0,0 +1,141 @@
+################################################################################
+###############################첨부 파일 업로드##################################
+################################################################################
+# 요청 크기 제한은 폼을 파싱하기 전에 ASGI 단계에서 검사한다 (RequestSizeLimitMiddleware).
+# 파싱이 끝난 업로드 파일은 Starlette 임시 파일에 있는 그대로 청크 단위로 읽어
+# 파일별 크기 제한과 SHA-256 체크섬만 확인하고(한 요청의 여러 파일은 동시에),
+# 저장소에 같은 내용이 없을 때만 최종 위치에 기록한다 (place_upload).
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from typing import List, NamedTuple
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # 1MB
+MAX_FILE_SIZE = int(os.getenv("UPLOAD_MAX_FILE_SIZE", str(50 * 1024 * 1024)))  # 파일당 50MB
+MAX_REQUEST_SIZE = int(os.getenv("UPLOAD_MAX_REQUEST_SIZE", str(200 * 1024 * 1024)))  # 요청당 200MB
+
+
+# 검증이 끝난 업로드 파일 정보
+class CheckedUpload(NamedTuple):
+    file: UploadFile  # 내용은 아직 Starlette 임시 파일에 있음
+    filename: str  # 원본 파일 이름
+    size: int  # 바이트 수
+    sha256: str  # 체크섬 (hex)
+
+
+# multipart 요청 본문 크기 제한: Content-Length로 먼저 거르고,
+# 길이가 없거나 거짓인 요청은 받은 바이트를 세다가 넘는 순간 중단한다 (폼 파싱 전에 413)
+class RequestSizeLimitMiddleware:
+    def __init__(self, app, limit: int = MAX_REQUEST_SIZE):
+        self.app = app
+        self.limit = limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            length = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            length = 0
+        if length > self.limit:
+            body = json.dumps({"detail": "Request too large"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        received = 0
+        async def receive_wrapper():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:  # 폼 파서로 전달되어 413 응답이 된다
+                    raise HTTPException(status_code=413, detail="Request too large")
+            return message
+
+        await self.app(scope, receive_wrapper, send)
+
+
+# 업로드 파일 하나를 청크 단위로 읽어 크기와 체크섬 확인 (디스크에 다시 쓰지 않음)
+async def check_upload(file: UploadFile) -> CheckedUpload:
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while True:
+        chunk = await file.read(CHUNK_SIZE)  # 청크 단위로 읽기
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail=f"File too large: {file.filename}")
+        digest.update(chunk)
+    return CheckedUpload(file, file.filename, size, digest.hexdigest())
+
+
+# 한 요청의 업로드 파일들을 동시에 검사
+# (저장 위치는 체크섬을 알고 난 뒤 storage.BlobStore가 정한다)
+async def check_uploads(files: List[UploadFile]) -> List[CheckedUpload]:
+    return list(await asyncio.gather(*(check_upload(file) for file in files)))
+
+
+# 임시 파일 내용을 out에 기록
+# 디스크로 넘어간 임시 파일은 이름 없는 파일이라 rename할 수 없으므로 커널 안에서 옮기고
+# (copy_file_range, CoW 파일 시스템에서는 블록 공유), 메모리에 있는 작은 파일은 그대로 쓴다.
+def _write_from(source, out, size: int):
+    source.seek(0)
+    if getattr(source, "_rolled", False) and hasattr(os, "copy_file_range"):
+        try:
+            offset = 0
+            while offset < size:
+                copied = os.copy_file_range(source.fileno(), out.fileno(), size - offset, offset)
+                if not copied:
+                    break
+                offset += copied
+            return
+        except OSError:  # 지원하지 않는 파일 시스템 조합: 일반 복사로
+            out.seek(0)
+            out.truncate()
+    shutil.copyfileobj(source, out, CHUNK_SIZE)
+
+
+def _place(upload: CheckedUpload, path: str):
+    part = f"{path}.{uuid.uuid4().hex}.part"  # 기록 중인 파일이 최종 경로에 보이지 않도록
+    try:
+        with open(part, "wb") as out:
+            _write_from(upload.file.file, out, upload.size)
+        os.replace(part, path)
+    except BaseException:
+        _remove_quietly(part)
+        raise
+
+
+# 검증된 업로드 파일을 path로 옮긴다
+async def place_upload(upload: CheckedUpload, path: str):
+    await run_in_threadpool(_place, upload, path)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,104 @@
+################################################################################
+###############################조회수 쓰기 지연 버퍼##############################
+################################################################################
+# 게시물을 읽을 때마다 update_one을 보내는 대신, 프로세스 메모리에
+# (게시판, 게시물 id)별 증가량을 모아 두었다가 주기적으로(그리고 종료 시)
+# 게시판별 unordered bulk_write 한 번으로 반영한다.
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))  # 초 단위
+MAX_PENDING = int(os.getenv("VIEW_MAX_PENDING", "10000"))  # 이 이상 쌓이면 바로 반영
+
+
+class ViewCountBuffer:
+    def __init__(self, interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[str, ObjectId], int] = defaultdict(int)
+        self._flushing: Dict[Tuple[str, ObjectId], int] = {}  # 반영 중인 증가량
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._db: Optional[AsyncIOMotorDatabase] = None
+
+    # 조회수 1 증가 (메모리에만 기록)
+    def add(self, board: str, post_id: ObjectId, amount: int = 1):
+        self._pending[(board, post_id)] += amount
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    # 아직 DB에 반영되지 않은 증가량
+    def pending(self, board: str, post_id: ObjectId) -> int:
+        key = (board, post_id)
+        return self._pending.get(key, 0) + self._flushing.get(key, 0)
+
+    # 모아둔 증가량을 게시판별 bulk_write로 반영
+    async def flush(self, db: AsyncIOMotorDatabase):
+        if not self._pending:
+            return
+        self._flushing, self._pending = self._pending, defaultdict(int)
+
+        operations = defaultdict(list)
+        keys = defaultdict(list)
+        for (board, post_id), amount in self._flushing.items():
+            operations[board].append(UpdateOne({"_id": post_id}, {"$inc": {"views": amount}}))
+            keys[board].append((board, post_id))
+
+        try:
+            for board, board_operations in operations.items():
+                try:
+                    await db[board].bulk_write(board_operations, ordered=False)
+                except BulkWriteError as e:
+                    # 개별 연산 실패는 재시도해도 같은 결과이므로 기록만 한다
+                    logger.warning("view count flush for %s partially failed: %s", board, e.details)
+                except Exception:
+                    # 연결 오류 등: 이 게시판의 증가량을 다음 주기로 넘긴다
+                    logger.exception("view count flush for %s failed", board)
+                    for key in keys[board]:
+                        self._pending[key] += self._flushing.pop(key)
+                    continue
+                # 반영된 게시판은 바로 빼서 pending()이 DB 값과 이중으로 세지 않게 한다
+                for key in keys[board]:
+                    del self._flushing[key]
+        finally:
+            self._flushing = {}
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush(self._db)
+
+    # 애플리케이션 시작 시 주기적 반영 작업 시작
+    def start(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._stopping = False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    # 애플리케이션 종료 시 작업을 멈추고 남은 증가량을 반영
+    async def stop(self):
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._db is not None:
+            await self.flush(self._db)
+
+
+view_buffer = ViewCountBuffer()